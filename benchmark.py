@@ -0,0 +1,114 @@
+from feature_extractor import FeaturePipeline, load_mesh
+import numpy as np
+import sys
+import time
+
+#speed / accuracy of the classification options, against the default 5-hop patch_PCA
+#usage: python benchmark.py [model.ply ...]
+DEMO_MODELS = ("tea_cup.ply", "portrait1.ply", "portrait2.ply")
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def reference_labels(vertices, triangles):
+    #labels and seconds of the default classification (5-hop patches, full patch_PCA)
+    pipeline = FeaturePipeline()
+    result, seconds = timed(pipeline.classify_vertices, vertices, triangles)
+    return pipeline.vertex_labels(len(vertices), *result), seconds
+
+def score(name, vertices, result, seconds, reference):
+    pipeline = FeaturePipeline()
+    scores = pipeline.label_agreement(pipeline.vertex_labels(len(vertices), *result), reference)
+    return (name, seconds, scores["agreement"], scores["edge_iou"])
+
+def benchmark_patch_cap(vertices, triangles, reference, caps=(16, 32, 64, 128)):
+    #patch_PCA with every patch capped at K neighbors
+    pipeline = FeaturePipeline()
+    rows = []
+    for cap in caps:
+        result, seconds = timed(pipeline.classify_vertices, vertices, triangles, max_patch=cap)
+        rows.append(score(f"K={cap}", vertices, result, seconds, reference))
+    return rows
+
+def benchmark_seeds(vertices, triangles, reference, spacings=(1, 2, 4)):
+    #patch_PCA on voxel seeds only, spacing in mean edge lengths
+    pipeline = FeaturePipeline()
+    edges = np.asarray(triangles)[:, [0, 1]]
+    edge_length = np.linalg.norm(vertices[edges[:, 0]] - vertices[edges[:, 1]], axis=1).mean()
+    rows = []
+    for spacing in spacings:
+        result, seconds = timed(pipeline.seed_classify, vertices, triangles, spacing * edge_length)
+        rows.append(score(f"{len(pipeline.seeds)} seeds", vertices, result, seconds, reference))
+    return rows
+
+def benchmark_gather(vertices, triangles, repeats=5):
+    #patch_PCA style gather (vertices[neighbors] of every 5-hop patch) in the file order, a shuffled
+    #order (worst case scan), and after reordering; seconds per pass and speedup over the file order
+    pipeline = FeaturePipeline()
+    orders = {
+        "file": np.arange(len(vertices)),
+        "shuffled": np.random.default_rng(0).permutation(len(vertices)),
+        "morton": pipeline.vertex_order(vertices, triangles, "morton"),
+        "rcm": pipeline.vertex_order(vertices, triangles, "rcm"),
+    }
+    rows = []
+    for name, order in orders.items():
+        v, t = pipeline.reorder_mesh(vertices, triangles, order)
+        indptr, indices = pipeline.adjacency_csr(t, len(v), hops=5)
+        starts = indptr[:-1][np.diff(indptr) > 0]
+        seconds = []
+        for _ in range(repeats):
+            _, elapsed = timed(lambda: np.add.reduceat(v[indices], starts, axis=0))
+            seconds.append(elapsed)
+        rows.append((name, min(seconds)))
+    return [(name, seconds, rows[0][1] / seconds) for name, seconds in rows]
+
+def validate_float32(vertices, triangles, modes=("pca", "dihedral", "normals")):
+    #float32 pipeline against float64: label agreement, and the curve features of the same (float64) curves
+    #feature error is relative to the largest value of each feature; directions are compared up to sign
+    rows = []
+    for mode in modes:
+        double, single = FeaturePipeline(), FeaturePipeline()
+        _, seconds64 = timed(double.run_pipeline, vertices, triangles, mode)
+        _, seconds32 = timed(single.run_pipeline, vertices, triangles, mode, dtype=np.float32)
+        n = len(vertices)
+        scores = double.label_agreement(single.vertex_labels(n, single.edges, single.corners, single.faces),
+                                        double.vertex_labels(n, double.edges, double.corners, double.faces))
+        a = double.compute_curve_descriptors(double.curves, np.asarray(vertices, dtype=np.float64))
+        b = single.compute_curve_descriptors(double.curves, np.asarray(vertices, dtype=np.float32))
+        if len(a):
+            feature_error = (np.abs(b[:, :3] - a[:, :3]).max(axis=0) / np.maximum(np.abs(a[:, :3]).max(axis=0), 1e-12)).max()
+            direction_cos = np.abs(np.einsum("ij,ij->i", a[:, 3:], b[:, 3:])).min()
+        else:
+            feature_error, direction_cos = 0.0, 1.0
+        rows.append((mode, seconds64, seconds32, scores["agreement"], scores["edge_iou"], len(double.curves), len(single.curves), feature_error, direction_cos))
+    return rows
+
+def print_rows(title, rows):
+    print(title)
+    print(f"{'':>16} {'seconds':>9} {'agreement':>10} {'edge iou':>9}")
+    for name, seconds, agreement, edge_iou in rows:
+        print(f"{name:>16} {seconds:>9.3f} {agreement * 100:>9.2f}% {edge_iou * 100:>8.2f}%")
+    print()
+
+if __name__ == "__main__":
+
+    for path in sys.argv[1:] or DEMO_MODELS:
+        vertices, triangles = load_mesh(path)
+        reference, seconds = reference_labels(vertices, triangles)
+        print(f"{path}: {len(vertices)} vertices, {len(triangles)} triangles, full patch_PCA {seconds:.3f}s")
+        #the uncapped classification on top of each table, so the speedups can be read off
+        baseline = ("full", seconds, 1.0, 1.0)
+        print_rows("patch size cap", [baseline] + benchmark_patch_cap(vertices, triangles, reference))
+        print_rows("sparse seeds", [baseline] + benchmark_seeds(vertices, triangles, reference))
+        print("patch gather")
+        for name, seconds, speedup in benchmark_gather(vertices, triangles):
+            print(f"{name:>16} {seconds:>9.4f} {speedup:>9.2f}x")
+        print()
+        print("float32 validation")
+        print(f"{'':>16} {'s float64':>10} {'s float32':>10} {'agreement':>10} {'edge iou':>9} {'curves':>11} {'feature err':>12} {'direction':>10}")
+        for mode, seconds64, seconds32, agreement, edge_iou, curves64, curves32, feature_error, direction_cos in validate_float32(vertices, triangles):
+            print(f"{mode:>16} {seconds64:>10.3f} {seconds32:>10.3f} {agreement * 100:>9.2f}% {edge_iou * 100:>8.2f}% {curves64:>5}/{curves32:<5} {feature_error:>12.2e} {direction_cos:>10.6f}")
+        print()
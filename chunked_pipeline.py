@@ -0,0 +1,178 @@
+from feature_extractor import FeaturePipeline, load_mesh
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+def save_mesh_arrays(path, vertices_path, triangles_path):
+    #mesh file -> .npy arrays that ChunkedClassifier can memory-map
+    vertices, triangles = load_mesh(path)
+    np.save(vertices_path, vertices)
+    np.save(triangles_path, triangles.astype(np.int64))
+
+
+class ChunkedClassifier:
+    #vertex classification of meshes larger than memory
+    #the mesh is split in slabs of about block_vertices vertices along its longest axis; every slab is
+    #classified with a halo of hops edges around it (bounded by the longest edges near that slab),
+    #so each of its vertices sees its whole hop patch
+    def __init__(self, mode="pca", hops=5, block_vertices=1_000_000, chunk_rows=1 << 20, bins_per_block=256):
+        self.mode = mode
+        #reach of the classification in edges (5 for the hop patches of patch_PCA, 1 for dihedral / normals)
+        self.hops = hops
+        #about how many vertices are classified together
+        self.block_vertices = block_vertices
+        #rows read from the memory-mapped arrays at a time
+        self.chunk_rows = chunk_rows
+        #histogram bins per slab, the resolution of the slab bounds and of the halo edge bounds
+        self.bins_per_block = bins_per_block
+
+    def classify(self, vertices_path, triangles_path, labels_path):
+        #labels (see FeaturePipeline.vertex_labels) written to a memory-mapped .npy file, which is returned
+        vertices = np.load(vertices_path, mmap_mode="r")
+        triangles = np.load(triangles_path, mmap_mode="r")
+        labels = np.lib.format.open_memmap(labels_path, mode="w+", dtype=np.int8, shape=(len(vertices),))
+        pipeline = FeaturePipeline()
+        for axis, low, high, last, reach_low, reach_high in self.blocks(vertices, triangles, self.hops):
+            ids, local_triangles = self.block_mesh(vertices, triangles, axis, reach_low, reach_high)
+            x = vertices[ids, axis]
+            core = (x >= low) & ((x < high) | last)
+            if not core.any():
+                continue
+            result = pipeline.classify_vertices(np.asarray(vertices[ids]), local_triangles, self.mode)
+            labels[ids[core]] = pipeline.vertex_labels(len(ids), *result)[core]
+        labels.flush()
+        return labels
+
+    def chunks(self, array):
+        for start in range(0, len(array), self.chunk_rows):
+            yield start, np.asarray(array[start:start + self.chunk_rows])
+
+    def blocks(self, vertices, triangles, hops):
+        #(axis, low, high, last, reach_low, reach_high) slabs along the longest axis of the bounding box
+        #the slab bounds are vertex count quantiles, so every slab holds about block_vertices vertices
+        #however dense the mesh is; [reach_low, reach_high] holds every vertex within hops edges of the slab
+        low = np.full(3, np.inf)
+        high = np.full(3, -np.inf)
+        for _, v in self.chunks(vertices):
+            low = np.minimum(low, v.min(axis=0, initial=np.inf))
+            high = np.maximum(high, v.max(axis=0, initial=-np.inf))
+        if len(vertices) == 0:
+            return []
+        axis = int(np.argmax(high - low))
+        count = max(1, -(-len(vertices) // self.block_vertices))
+        num_bins = count * self.bins_per_block
+        edges = np.linspace(low[axis], high[axis], num_bins + 1)
+
+        def bin_of(x):
+            return np.clip(np.searchsorted(edges, x, side="right") - 1, 0, num_bins - 1)
+
+        histogram = np.zeros(num_bins, dtype=np.int64)
+        for _, v in self.chunks(vertices):
+            histogram += np.bincount(bin_of(v[:, axis]), minlength=num_bins)
+        cut = np.searchsorted(np.cumsum(histogram), np.arange(1, count) * len(vertices) / count)
+        bounds = np.unique(np.concatenate(([low[axis]], edges[cut + 1], [high[axis]])))
+        if len(bounds) == 1:
+            bounds = np.repeat(bounds, 2)
+
+        #longest edge of the triangles overlapping every bin
+        longest = np.zeros(num_bins)
+        for _, tri in self.chunks(triangles):
+            v = vertices[tri.ravel()].reshape(-1, 3, 3)
+            length = np.linalg.norm(v - v[:, [1, 2, 0]], axis=2).max(axis=1)
+            first, last = bin_of(v[:, :, axis].min(axis=1)), bin_of(v[:, :, axis].max(axis=1))
+            span = last - first
+            for offset in range(span.max(initial=-1) + 1):
+                wide = np.flatnonzero(span >= offset)
+                np.maximum.at(longest, first[wide] + offset, length[wide])
+
+        slabs = []
+        for i in range(len(bounds) - 1):
+            #grow the slab by one edge at a time, with the longest edge around the part reached so far
+            reach_low, reach_high = bounds[i], bounds[i + 1]
+            for _ in range(hops):
+                step = longest[bin_of(reach_low):bin_of(reach_high) + 1].max()
+                reach_low, reach_high = reach_low - step, reach_high + step
+            slabs.append((axis, bounds[i], bounds[i + 1], i == len(bounds) - 2, reach_low, reach_high))
+        return slabs
+
+    def block_mesh(self, vertices, triangles, axis, low, high):
+        #global ids of the vertices between low and high along axis, and the triangles made only of them
+        ids = []
+        for start, v in self.chunks(vertices):
+            ids.append(start + np.flatnonzero((v[:, axis] >= low) & (v[:, axis] <= high)))
+        ids = np.concatenate(ids) if ids else np.zeros(0, dtype=int)
+        local_triangles = []
+        for _, tri in self.chunks(triangles):
+            local = np.searchsorted(ids, tri)
+            inside = (ids[np.minimum(local, len(ids) - 1)] == tri).all(axis=1) if len(ids) else np.zeros(len(tri), dtype=bool)
+            local_triangles.append(local[inside])
+        local_triangles = np.concatenate(local_triangles) if local_triangles else np.zeros((0, 3), dtype=int)
+        return ids, local_triangles
+
+
+def identical_curves(curves, reference):
+    #how many of the reference curves come out exactly the same (same points in the same order)
+    found = {tuple(curve) for curve in curves}
+    return sum(tuple(curve) in found for curve in reference)
+
+
+class TiledPipeline(ChunkedClassifier):
+    #classification, feature curves and curve features, with every slab (tile) in its own worker process
+    #workers classify their tile and send back the one-ring edge point neighbors of their edge points;
+    #the merge stage walks that edge graph over the global vertex ids exactly like the serial
+    #extract_feature_curves (the walk is greedy, so where a curve ends depends on every earlier curve,
+    #and walking fragments per tile and joining them gives different curves)
+    def run(self, vertices_path, triangles_path, labels_path, workers=None):
+        vertices = np.load(vertices_path, mmap_mode="r")
+        triangles = np.load(triangles_path, mmap_mode="r")
+        labels = np.lib.format.open_memmap(labels_path, mode="w+", dtype=np.int8, shape=(len(vertices),))
+        #one more edge of halo, so the labels of the points just outside a tile are exact as well
+        tiles = self.blocks(vertices, triangles, self.hops + 1)
+
+        pipeline = FeaturePipeline()
+        pipeline.adg_list_onehop = {}
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            jobs = [(vertices_path, triangles_path, tile) for tile in tiles]
+            for core, core_labels, edge_graph in executor.map(self.process_tile, *zip(*jobs)):
+                labels[core] = core_labels
+                pipeline.adg_list_onehop.update(edge_graph)
+        labels.flush()
+
+        self.labels = labels
+        edges = np.sort(np.fromiter(pipeline.adg_list_onehop, dtype=np.int64, count=len(pipeline.adg_list_onehop)))
+        self.curves = pipeline.extract_feature_curves(edges, vertices)
+        self.original_curves, self.groups, self.features = pipeline.group_feature_curves(self.curves, vertices)
+        return self.features
+
+    def process_tile(self, vertices_path, triangles_path, tile):
+        #labels of the tile's vertices and {edge point: its edge point neighbors} for the tile's edge points
+        #the neighbors come from find_adjacency_list on the global ids, so their order (which the walk
+        #depends on) is the same as in the serial pipeline
+        vertices = np.load(vertices_path, mmap_mode="r")
+        triangles = np.load(triangles_path, mmap_mode="r")
+        axis, low, high, last, reach_low, reach_high = tile
+        ids, local_triangles = self.block_mesh(vertices, triangles, axis, reach_low, reach_high)
+        local_vertices = np.asarray(vertices[ids])
+        x = local_vertices[:, axis]
+        core = (x >= low) & ((x < high) | last)
+
+        pipeline = FeaturePipeline()
+        labels = pipeline.vertex_labels(len(ids), *pipeline.classify_vertices(local_vertices, local_triangles, self.mode))
+        points = ids[(labels == 2) & core]
+        neighbors = pipeline.find_adjacency_list(ids[local_triangles], len(vertices), hops=1, rows=points)
+        edge_graph = {point: n[labels[np.searchsorted(ids, n)] == 2] for point, n in zip(points.tolist(), neighbors)}
+        return ids[core], labels[core], edge_graph
+
+if __name__ == "__main__":
+
+    save_mesh_arrays("tea_cup.ply", "tea_cup_vertices.npy", "tea_cup_triangles.npy")
+    labels = ChunkedClassifier(block_vertices=20000).classify("tea_cup_vertices.npy", "tea_cup_triangles.npy", "tea_cup_labels.npy")
+    print(f"Points in edges: {np.count_nonzero(labels == 2)},Points in Corners: {np.count_nonzero(labels == 3)}, Points in Faces: {np.count_nonzero(labels == 1)}")
+
+    pipeline = TiledPipeline(block_vertices=20000)
+    pipeline.run("tea_cup_vertices.npy", "tea_cup_triangles.npy", "tea_cup_labels.npy")
+    print(f"Curves: {len(pipeline.curves)}, Objects: {len(pipeline.groups)}")
+
+    #the tiled curves must be the serial ones
+    serial = FeaturePipeline()
+    serial.run_pipeline(*load_mesh("tea_cup.ply"))
+    print(f"Identical curves: {identical_curves(pipeline.curves, serial.curves)} of {len(serial.curves)} serial, {len(pipeline.curves)} tiled")
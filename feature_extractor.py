@@ -1,9 +1,13 @@
 from vvrpywork.constants import *
 from vvrpywork.scene import *
 from vvrpywork.shapes import *
+from collections import defaultdict
 from random import random,seed
-from scipy.spatial import ConvexHull
+from scipy.sparse import coo_matrix, csr_matrix, identity
+from scipy.sparse.csgraph import connected_components, dijkstra, reverse_cuthill_mckee
+from scipy.spatial import ConvexHull, cKDTree
 import numpy as np
+import open3d as o3d
 
 
 seed(42)
@@ -11,95 +15,91 @@ np.random.seed(42)
 WIDTH = 800
 HEIGHT = 800
 
-class FeatureCurves(Scene3D):
-    def __init__(self):
-        super().__init__(WIDTH, HEIGHT, "Project")
-
-    def load_model(self, path):
-        self.model = Mesh3D(path, color=Color.GRAY)
-        self.addShape(self.model, "model")
-        return self.model
-
-
-    def reset(self):
-        self.adg_list_onehop = self.find_adjacency_list(self.model.triangles, len(self.model.vertices), hops=1)       
-        self.adj_list = self.find_adjacency_list(self.model.triangles, len(self.model.vertices), hops=5)       
-        self.Task1_classify_vertices()
- 
-        self.curves = self.extract_feature_curves(self.edges,self.model.vertices)
-        #self.Task2_3_colored_feature_curves()
-        original_curves, groups, features = self.group_feature_curves(self.curves, self.model.vertices)
-        self.features = features  # αποθήκευση σε attribute
-        self.groups = groups
-        self.original_curves = original_curves
-       
-        self.Task4_group_feature_curves()
-
-      
-    def Task1_classify_vertices(self):
-        self.edges, self.corners, self.faces = self.patch_PCA(self.model.vertices, self.adj_list)
-        print(f"Points in edges: {len(self.edges)},Points in Corners: {len(self.corners)}, Points in Faces: {len(self.faces)}")
-        vc = self.model.vertex_colors
-        vc[self.faces] = (0, 0, 1) #blue
-        vc[self.edges] = (0, 1, 0) #green
-        vc[self.corners] = (1, 0, 0) #red
-        self.model.vertex_colors =vc
-        self.updateShape("model")
-
-    def Task2_3_colored_feature_curves(self):
-        
-        vertices = self.model.vertices  
-        print(f"Curves: {len(self.curves)}")
-        for idx, curve in enumerate(self.curves):
-            line_segments = []
-
-            ordered_curve = self.order_curve_points(curve, self.adg_list_onehop)
-            curve_points = np.array([vertices[v] for v in ordered_curve])
-            
-            max_dist = 0.05 
-
-            for i in range(len(curve_points) - 1):
-                p1 = curve_points[i]
-                p2 = curve_points[i + 1]
-                dist = np.linalg.norm(p1 - p2)
-
-                if dist < max_dist:
-                    line_segments.append([i, i + 1])
-
-            # each curve has different color
-            color = (random(), random(), random())
-
-            lineset = LineSet3D(points=curve_points.tolist(), lines=line_segments, width=3, color=color)
-            self.addShape(lineset, f"feature_curve_{idx}")
-
-
-    def Task4_group_feature_curves(self):
-        vertices = self.model.vertices
-        print(f"Objects: {len(self.groups)}")
-        
-        for group_idx, group in enumerate(self.groups):
-            color = (random(), random(), random())  
-
-            for curve_idx in group:
-                line_segments =[]
-                curve = self.original_curves[curve_idx]
-                ordered_curve = self.order_curve_points(curve, self.adg_list_onehop)
-                curve_points = np.array([vertices[v] for v in ordered_curve])
-                max_dist = 0.05 
-
-                for i in range(len(curve_points) - 1):
-                    p1 = curve_points[i]
-                    p2 = curve_points[i + 1]
-                    dist = np.linalg.norm(p1 - p2)
-
-                    if dist < max_dist:
-                        line_segments.append([i, i + 1])
-
-                lineset = LineSet3D(points=curve_points.tolist(), lines=line_segments, width=3, color=color)
-                name = f"group_{group_idx}_curve_{curve_idx}"
-                self.addShape(lineset, name)
+def load_mesh(path):
+    #vertices and triangles of a mesh file, without opening a window
+    mesh = o3d.io.read_triangle_mesh(path)
+    return np.asarray(mesh.vertices).copy(), np.asarray(mesh.triangles).copy()
+
+def extract_features(path, mode="pca", patches="hops", reorder=None, dtype=None):
+    #normalized curve feature matrix of a mesh file
+    vertices, triangles = load_mesh(path)
+    return FeaturePipeline().run_pipeline(vertices, triangles, mode, patches, reorder, dtype)
+
+
+class FeaturePipeline:
+    #the feature curve computations; FeatureCurves adds the window and drawing on top
+
+    def run_pipeline(self, vertices, triangles, mode="pca", patches="hops", reorder=None, dtype=None):
+        #reorder: "morton" or "rcm" classifies a cache friendly copy of the mesh (the patch gathers), the labels
+        #are mapped back and the curves are traced on the original mesh, so they do not depend on the order
+        #dtype: np.float32 halves the memory of every per-vertex and per-curve array (computations follow
+        #the dtype of the vertices)
+        if dtype is not None:
+            vertices = np.asarray(vertices, dtype=dtype)
+        self.adg_list_onehop = self.find_adjacency_list(triangles, len(vertices), hops=1)
+        if reorder is not None:
+            order = self.vertex_order(vertices, triangles, reorder)
+            self.edges, self.corners, self.faces = self.classify_vertices(*self.reorder_mesh(vertices, triangles, order), mode, patches=patches)
+            self.restore_order(order, mode)
+        else:
+            self.edges, self.corners, self.faces = self.classify_vertices(vertices, triangles, mode, patches=patches)
+        self.curves = self.extract_feature_curves(self.edges, vertices)
+        self.original_curves, self.groups, self.features = self.group_feature_curves(self.curves, vertices)
+        return self.features
+
+    def vertex_order(self, vertices, triangles, method="morton"):
+        #new vertex order, where neighbors on the mesh are also close in memory
+        #"morton": along a z-order curve through space, "rcm": reverse cuthill-mckee on the mesh edges
+        if method == "morton":
+            return self.morton_order(vertices)
+        if method == "rcm":
+            indptr, indices = self.adjacency_csr(triangles, len(vertices))
+            graph = csr_matrix((np.ones(len(indices), dtype=np.int8), indices, indptr), shape=(len(vertices), len(vertices)))
+            return reverse_cuthill_mckee(graph, symmetric_mode=True).astype(int)
+        raise ValueError(f"Unknown vertex order: {method}")
+
+    def morton_order(self, vertices, bits=21):
+        vertices = np.asarray(vertices, dtype=float)
+        if len(vertices) == 0:
+            return np.zeros(0, dtype=int)
+        low = vertices.min(axis=0)
+        extent = (vertices.max(axis=0) - low).max()
+        cells = ((vertices - low) / (extent if extent > 0 else 1) * (2 ** bits - 1)).astype(np.uint64)
+        #interleave the bits of x, y, z: spread every coordinate to every third bit
+        code = np.zeros(len(vertices), dtype=np.uint64)
+        for axis in range(3):
+            x = cells[:, axis]
+            for shift, mask in ((32, 0x1f00000000ffff), (16, 0x1f0000ff0000ff), (8, 0x100f00f00f00f00f), (4, 0x10c30c30c30c30c3), (2, 0x1249249249249249)):
+                x = (x | (x << np.uint64(shift))) & np.uint64(mask)
+            code |= x << np.uint64(axis)
+        return np.argsort(code, kind="stable")
+
+    def reorder_mesh(self, vertices, triangles, order):
+        #vertex i of the new mesh is vertex order[i] of the old one
+        rank = np.empty(len(order), dtype=int)
+        rank[order] = np.arange(len(order))
+        return np.asarray(vertices)[order], rank[np.asarray(triangles, dtype=int)]
+
+    def restore_order(self, order, mode="pca"):
+        #maps the results of classify_vertices(mode) on a reordered mesh back to the original vertex ids
+        #edges, corners and faces in ascending order, like classify_vertices returns them
+        self.edges, self.corners, self.faces = (np.sort(order[labels]) for labels in (self.edges, self.corners, self.faces))
+        if mode == "pca":
+            adj_list = self.adj_list
+            if isinstance(adj_list, tuple):
+                indptr, indices = adj_list
+                adj_list = np.split(indices, indptr[1:-1])
+            rank = np.argsort(order)
+            self.adj_list = [order[np.asarray(adj_list[rank[i]], dtype=int)] for i in range(len(order))]
+        elif mode == "dihedral":
+            self.crease_edges = order[self.crease_edges]
+        elif mode == "normals":
+            eigenvalues = np.empty_like(self.normal_eigenvalues)
+            eigenvalues[order] = self.normal_eigenvalues
+            self.normal_eigenvalues = eigenvalues
+        elif mode == "seeds":
+            self.seeds = np.sort(order[self.seeds])
 
-                
     def extract_feature_curves(self, edge_indices, vertices):
          #O(1) lookup time in set
         edge_set = set(edge_indices)
@@ -178,11 +178,55 @@ class FeatureCurves(Scene3D):
         return ordered
     
 
+    def classify_vertices(self, vertices, triangles, mode="pca", triangle_normals=None, vertex_normals=None, patches="hops", radius=None, k=30, max_patch=None):
+        #edges, corners, faces of the mesh
+        #"pca": covariance of the patch of every vertex (patch_PCA), patches as in find_patches
+        #"dihedral": angle between the two faces of every mesh edge, for models with crisp creases
+        #"normals": spread of the vertex normals in the 1-ring of every vertex (normal_voting_classify)
+        #"seeds": patch_PCA on a spread out subset of vertices, labels propagated to the rest (seed_classify)
+        if mode == "pca":
+            if max_patch is not None and patches == "hops":
+                #capped while the patches are built, the full 5-hop patches never exist
+                return self.capped_patch_PCA(vertices, triangles, max_patch)
+            self.adj_list = self.find_patches(vertices, triangles, patches, radius, k)
+            return self.patch_PCA(vertices, self.adj_list, max_patch)
+        if mode == "dihedral":
+            return self.dihedral_classify(vertices, triangles, triangle_normals)
+        if mode == "normals":
+            return self.normal_voting_classify(vertices, triangles, vertex_normals)
+        if mode == "seeds":
+            return self.seed_classify(vertices, triangles, max_patch=max_patch)
+        raise ValueError(f"Unknown classification mode: {mode}")
+
+    def find_patches(self, vertices, triangles, patches="hops", radius=None, k=30):
+        #neighborhood of every vertex for patch_PCA
+        #"hops": vertices up to 5 edges away, "geodesic": vertices within radius along the surface
+        #"radius" / "knn": vertices within radius / the k nearest in space, no triangles needed
+        #(point clouds, meshes with duplicated vertices)
+        if patches == "hops":
+            return self.find_adjacency_list(triangles, len(vertices), hops=5)
+        if patches == "geodesic":
+            return self.geodesic_patches(vertices, triangles, radius)
+        if patches == "radius":
+            return self.kdtree_patches(vertices, radius=radius)
+        if patches == "knn":
+            return self.kdtree_patches(vertices, k=k)
+        raise ValueError(f"Unknown patch mode: {patches}")
+
     #principal component analysis: identify directions of maximum variance in a patch 
-    def patch_PCA(self, vertices, adj_list):
+    def patch_PCA(self, vertices, adj_list, max_patch=None, rows=None):
+        #rows: the vertex of every patch when adj_list does not hold one patch per vertex
         edges = []
         corners = []
         faces = []
+        if max_patch is not None:
+            #bounded work per vertex, max_patch should stay above the 10 neighbor cutoff
+            labels = self.batched_patch_labels(vertices, *self.cap_patches(vertices, adj_list, max_patch, rows))
+            return np.flatnonzero(labels == 2), np.flatnonzero(labels == 3), np.flatnonzero(labels == 1)
+        if isinstance(adj_list, tuple):
+            #CSR patches (indptr, indices)
+            indptr, indices = adj_list
+            adj_list = np.split(indices, indptr[1:-1])
 
         for i, neighbors in enumerate(adj_list):
             #skip if a vertex has lower than 10 neighbors
@@ -195,8 +239,8 @@ class FeatureCurves(Scene3D):
             # in each patch vertices are sifted such that the center mass is (0,0,0)
             centered = patch - centroid
 
-            #3x3 covariance matrix
-            cov = np.cov(centered.T)
+            #3x3 covariance matrix of the centered patch (accumulated in the dtype of the vertices)
+            cov = centered.T @ centered / (len(patch) - 1)
             eigvals = np.sort(np.linalg.eigvalsh(cov)) #l1<l2<l3
             total = eigvals.sum()
             if total < 1e-6:
@@ -222,9 +266,307 @@ class FeatureCurves(Scene3D):
         return np.array(edges, dtype=int), np.array(corners, dtype=int), np.array(faces, dtype=int)
      
     
-    def find_adjacency_list(self, triangles, num_vertices, hops): 
+    def dihedral_classify(self, vertices, triangles, normals=None, angle=30):
+        #one pass over the mesh edges: an edge whose two faces bend more than angle (degrees) is a crease
+        triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+        n = len(vertices)
+        if len(triangles) == 0:
+            self.crease_edges = np.zeros((0, 2), dtype=int)
+            return np.zeros(0, dtype=int), np.zeros(0, dtype=int), np.arange(n)
+        if normals is None:
+            normals = self.triangle_normals(vertices, triangles)
+
+        #the 3 edges of every triangle (lower vertex first) and the triangle they come from
+        edge = np.sort(triangles[:, [[0, 1], [1, 2], [2, 0]]].reshape(-1, 2), axis=1)
+        face = np.repeat(np.arange(len(triangles)), 3)
+        key = edge[:, 0] * n + edge[:, 1]
+        order = np.argsort(key, kind="stable")
+        key, edge, face = key[order], edge[order], face[order]
+
+        #after sorting, the faces of an edge are next to each other (2 on a manifold edge, 1 on the border)
+        first = np.r_[True, key[1:] != key[:-1]]
+        edge_id = np.cumsum(first) - 1
+        shared = np.flatnonzero(~first) - 1
+        n1, n2 = normals[face[shared]], normals[face[shared + 1]]
+        cos = np.einsum("ij,ij->i", n1, n2)
+        #degenerate triangles have no normal and cannot make a crease
+        bent = (cos < np.cos(np.radians(angle))) & (np.linalg.norm(n1, axis=1) * np.linalg.norm(n2, axis=1) > 0.5)
+        crease = np.zeros(edge_id[-1] + 1, dtype=bool)
+        crease[edge_id[shared[bent]]] = True
+        self.crease_edges = edge[first][crease]
+
+        #number of creases through every vertex: 1-2 on a feature line, 3 or more where lines meet
+        degree = np.bincount(self.crease_edges.ravel(), minlength=n)
+        edges = np.flatnonzero((degree == 1) | (degree == 2))
+        corners = np.flatnonzero(degree >= 3)
+        faces = np.flatnonzero(degree == 0)
+        return edges, corners, faces
+
+    def normal_voting_classify(self, vertices, triangles, normals=None, rings=1, angle=50):
+        #normal voting tensor: covariance of the normals around every vertex instead of the positions
+        #flat -> all normals agree (1 large eigenvalue), crease -> 2 groups of normals (2), corner -> 3
+        n = len(vertices)
+        if normals is None:
+            normals = self.vertex_normals(vertices, triangles)
+        indptr, indices = self.adjacency_csr(triangles, n, hops=rings)
+        #the vertex itself votes too
+        ring = csr_matrix((np.ones(len(indices), dtype=normals.dtype), indices, indptr), shape=(n, n)) + identity(n, dtype=normals.dtype, format="csr")
+        #sum of n n^T over every ring as one sparse product, (n, 3, 3)
+        tensors = (ring @ (normals[:, :, None] * normals[:, None, :]).reshape(n, 9)).reshape(n, 3, 3)
+        eigvals = np.linalg.eigvalsh(tensors) #l1<l2<l3
+        total = eigvals.sum(axis=1, keepdims=True)
+        eigvals = np.divide(eigvals, total, out=np.zeros_like(eigvals), where=total > 1e-12)
+        self.normal_eigenvalues = eigvals
+        l1, l2, l3 = eigvals.T
+
+        #two equal groups of normals an angle a apart give l2/l3 = tan(a/2)^2
+        #(vertex normals on a crease are averaged, so a crease looks flatter here than to dihedral_classify)
+        ratio = np.tan(np.radians(angle) / 2) ** 2
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corner = l1 / l3 > ratio
+            edge = ~corner & (l2 / l3 > ratio)
+        known = l3 > 0
+        corners = np.flatnonzero(known & corner)
+        edges = np.flatnonzero(known & edge)
+        faces = np.flatnonzero(known & ~corner & ~edge)
+        return edges, corners, faces
+
+    def adjacency_csr(self, triangles, num_vertices, hops=1, rows=None):
+        #vertices reachable in up to hops steps, as CSR (indptr, indices) without the vertex itself
+        #rows: only for these vertices (row k of the result is vertex rows[k])
+        return self.hop_reach(self.step_matrix(triangles, num_vertices), hops, rows)
+
+    def step_matrix(self, triangles, num_vertices):
+        #boolean one-ring adjacency matrix
+        triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+        i = triangles[:, [0, 1, 2, 1, 2, 0]].ravel()
+        j = triangles[:, [1, 2, 0, 0, 1, 2]].ravel()
+        return csr_matrix((np.ones(len(i), dtype=bool), (i, j)), shape=(num_vertices, num_vertices))
+
+    def hop_reach(self, step, hops, rows=None):
+        start = np.arange(step.shape[0]) if rows is None else np.asarray(rows, dtype=int)
+        reach = step[start]
+        for _ in range(hops - 1):
+            reach = reach + reach @ step
+        reach = reach.tocoo()
+        keep = reach.col != start[reach.row]
+        reach = csr_matrix((reach.data[keep], (reach.row[keep], reach.col[keep])), shape=reach.shape)
+        reach.sort_indices()
+        return reach.indptr, reach.indices
+
+    def geodesic_patches(self, vertices, triangles, radius=None, block_size=256):
+        #vertices within a geodesic distance (shortest path along mesh edges) of every vertex, as CSR (indptr, indices)
+        #patch size then follows the surface area, not the tessellation density
+        vertices = np.asarray(vertices)
+        n = len(vertices)
+        indptr, indices = self.adjacency_csr(triangles, n)
+        rows = np.repeat(np.arange(n), np.diff(indptr))
+        lengths = np.linalg.norm(vertices[rows] - vertices[indices], axis=1)
+        if radius is None:
+            #about as far as 5 hops on an even tessellation
+            radius = 5 * lengths.mean() if len(lengths) else 0
+        #duplicated vertices: a zero length would drop the edge from the graph
+        graph = csr_matrix((np.maximum(lengths, 1e-12), indices, indptr), shape=(n, n))
+
+        #a geodesic path never leaves the euclidean ball of its length, so every block of nearby
+        #vertices only needs dijkstra on the subgraph inside the balls around it
+        tree = cKDTree(vertices)
+        patch_rows, patch_cols = [], []
+        for block in np.array_split(tree.indices, max(1, -(-n // block_size))):
+            near = np.unique(np.concatenate(tree.query_ball_point(vertices[block], radius, workers=-1)))
+            dist = dijkstra(graph[near][:, near], directed=False, indices=np.searchsorted(near, block), limit=radius)
+            r, c = np.nonzero(np.isfinite(dist))
+            c = near[c]
+            keep = c != block[r]
+            patch_rows.append(block[r[keep]])
+            patch_cols.append(c[keep])
+
+        rows = np.concatenate(patch_rows) if patch_rows else np.zeros(0, dtype=int)
+        cols = np.concatenate(patch_cols) if patch_cols else np.zeros(0, dtype=int)
+        patches = csr_matrix((np.ones(len(rows), dtype=bool), (rows, cols)), shape=(n, n))
+        patches.sort_indices()
+        return patches.indptr, patches.indices
+
+    def kdtree_patches(self, vertices, radius=None, k=None):
+        #the k nearest vertices (if k is given) or all vertices within radius, as CSR (indptr, indices)
+        vertices = np.asarray(vertices)
+        n = len(vertices)
+        tree = cKDTree(vertices)
+        rows = np.arange(n)
+        if k is not None:
+            _, neighbors = tree.query(vertices, k=k + 1, workers=-1)
+            neighbors = neighbors.reshape(n, -1)
+            #drop the vertex itself (and the missing ones of a tiny cloud); a duplicate may hide it, then drop the last one
+            keep = (neighbors != rows[:, None]) & (neighbors < n)
+            keep &= np.cumsum(keep, axis=1) <= k
+            indptr = np.concatenate(([0], np.cumsum(keep.sum(axis=1))))
+            return indptr, neighbors[keep]
+
+        if radius is None:
+            #about 5 times the spacing of the points
+            spacing, _ = tree.query(vertices, k=2, workers=-1)
+            radius = 5 * spacing[:, 1].mean() if n > 1 else 0
+        neighbors = tree.query_ball_point(vertices, radius, workers=-1, return_sorted=True)
+        counts = np.fromiter(map(len, neighbors), dtype=int, count=n)
+        indices = np.concatenate(neighbors).astype(int) if n else np.zeros(0, dtype=int)
+        owner = np.repeat(rows, counts)
+        keep = indices != owner
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(owner[keep], minlength=n))))
+        return indptr, indices[keep]
+
+    def vertex_normals(self, vertices, triangles):
+        #area weighted average of the normals of the triangles around every vertex
+        v = np.asarray(vertices)[triangles]
+        weighted = np.cross(v[:, 1] - v[:, 0], v[:, 2] - v[:, 0]) # length = 2 * area
+        normals = np.stack([np.bincount(np.ravel(triangles), weights=np.repeat(weighted[:, k], 3), minlength=len(vertices)) for k in range(3)], axis=1).astype(weighted.dtype)
+        length = np.linalg.norm(normals, axis=1, keepdims=True)
+        return np.divide(normals, length, out=np.zeros_like(normals), where=length > 0)
+
+    def triangle_normals(self, vertices, triangles):
+        #unit normals of all triangles (zero for degenerate ones)
+        v = np.asarray(vertices)[triangles]
+        normals = np.cross(v[:, 1] - v[:, 0], v[:, 2] - v[:, 0])
+        length = np.linalg.norm(normals, axis=1, keepdims=True)
+        return np.divide(normals, length, out=np.zeros_like(normals), where=length > 0)
+
+    def seed_classify(self, vertices, triangles, spacing=None, hops=5, max_patch=None):
+        #patch_PCA (on hop patches) only for one seed vertex per voxel of size spacing; every other vertex
+        #takes the label of its nearest seed along the mesh, then vertices where two labels meet are
+        #recomputed exactly until the boundaries stop moving
+        vertices = np.asarray(vertices)
+        n = len(vertices)
+        indptr, indices = self.adjacency_csr(triangles, n)
+        rows = np.repeat(np.arange(n), np.diff(indptr))
+        lengths = np.linalg.norm(vertices[rows] - vertices[indices], axis=1)
+        if spacing is None:
+            spacing = 2 * lengths.mean() if len(lengths) else 1
+
+        def classify(subset):
+            patches = self.adjacency_csr(triangles, n, hops, rows=subset)
+            return self.vertex_labels(len(subset), *self.patch_PCA(vertices, patches, max_patch, subset))
+
+        seeds = self.voxel_seeds(vertices, spacing)
+        self.seeds = seeds
+        graph = csr_matrix((np.maximum(lengths, 1e-12), indices, indptr), shape=(n, n))
+        _, _, source = dijkstra(graph, directed=False, indices=seeds, min_only=True, return_predecessors=True)
+        labels = np.zeros(n, dtype=np.int8)
+        reached = source >= 0
+        labels[reached] = classify(seeds)[np.searchsorted(seeds, source[reached])]
+
+        exact = np.zeros(n, dtype=bool)
+        exact[seeds] = True
+        while True:
+            boundary = np.unique(rows[labels[rows] != labels[indices]])
+            boundary = boundary[~exact[boundary]]
+            if len(boundary) == 0:
+                break
+            labels[boundary] = classify(boundary)
+            exact[boundary] = True
+        return np.flatnonzero(labels == 2), np.flatnonzero(labels == 3), np.flatnonzero(labels == 1)
+
+    def voxel_seeds(self, vertices, spacing):
+        #the vertex closest to the center of every occupied voxel, sorted
+        vertices = np.asarray(vertices)
+        if len(vertices) == 0:
+            return np.zeros(0, dtype=int)
+        origin = vertices.min(axis=0)
+        cells = np.floor((vertices - origin) / spacing).astype(np.int64)
+        dist = np.linalg.norm(vertices - origin - (cells + 0.5) * spacing, axis=1)
+        _, cell = np.unique(cells, axis=0, return_inverse=True)
+        cell = cell.ravel()
+        order = np.lexsort((dist, cell))
+        first = np.r_[True, cell[order][1:] != cell[order][:-1]]
+        return np.sort(order[first])
+
+    def cap_patches(self, vertices, patches, max_patch, rows=None):
+        #at most max_patch neighbors per vertex, as CSR (indptr, indices)
+        #the patch is sorted by distance to its vertex and sampled at even steps, so near and far
+        #rings keep their share and the result is deterministic
+        #rows: the vertex of every patch, when it is not patch i -> vertex i
+        if isinstance(patches, tuple):
+            indptr, indices = patches
+        else:
+            indptr = np.concatenate(([0], np.cumsum([len(p) for p in patches]))).astype(int)
+            indices = np.concatenate(patches).astype(int) if len(patches) else np.zeros(0, dtype=int)
+        counts = np.diff(indptr)
+        local = np.arange(len(counts))
+        owner = np.repeat(local, counts)
+        centers = vertices[owner] if rows is None else vertices[np.asarray(rows)[owner]]
+        dist = np.linalg.norm(vertices[indices] - centers, axis=1)
+        indices = indices[np.lexsort((dist, owner))]
+
+        kept = np.minimum(counts, max_patch)
+        capped_indptr = np.concatenate(([0], np.cumsum(kept)))
+        row = np.repeat(local, kept)
+        step = np.arange(capped_indptr[-1]) - capped_indptr[row]
+        return capped_indptr, indices[indptr[row] + step * counts[row] // kept[row]]
+
+    def capped_patch_PCA(self, vertices, triangles, max_patch, hops=5, block_size=4096):
+        #patch_PCA on hop patches capped at max_patch, O(V * max_patch): every block of vertices gets its
+        #patches from the sparse hop reach, capped right away and classified with one batched eigvalsh
+        vertices = np.asarray(vertices)
+        n = len(vertices)
+        step = self.step_matrix(triangles, n)
+        labels = np.zeros(n, dtype=np.int8)
+        for start in range(0, n, block_size):
+            rows = np.arange(start, min(start + block_size, n))
+            patches = self.cap_patches(vertices, self.hop_reach(step, hops, rows), max_patch, rows)
+            labels[rows] = self.batched_patch_labels(vertices, *patches)
+        return np.flatnonzero(labels == 2), np.flatnonzero(labels == 3), np.flatnonzero(labels == 1)
+
+    def batched_patch_labels(self, vertices, indptr, indices):
+        #vertex_labels codes of CSR patches with the rules of patch_PCA, all covariances as one (patches, K, 3) array
+        counts = np.diff(indptr)
+        m, width = len(counts), counts.max(initial=0)
+        row = np.repeat(np.arange(m), counts)
+        dense = np.zeros((m, width), dtype=int)
+        valid = np.zeros((m, width), dtype=bool)
+        position = np.arange(len(indices)) - indptr[row]
+        dense[row, position] = indices
+        valid[row, position] = True
+
+        patch = np.asarray(vertices)[dense] * valid[:, :, None]
+        size = np.maximum(counts, 1).astype(patch.dtype)[:, None]
+        centroid = patch.sum(axis=1) / size
+        centered = (patch - centroid[:, None, :]) * valid[:, :, None]
+        cov = np.einsum("pki,pkj->pij", centered, centered) / np.maximum(counts - 1, 1).astype(patch.dtype)[:, None, None]
+        eigvals = np.linalg.eigvalsh(cov) #l1<l2<l3
+        total = eigvals.sum(axis=1)
+        known = (counts > 10) & (total >= 1e-6)
+        l1, l2, l3 = (eigvals / np.where(known, total, 1)[:, None]).T
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corner = known & (l1 / l3 > 0.08)
+            edge = known & ~corner & (l3 / (l1 + l2) > 4)
+            face = known & ~corner & ~edge & (l3 < 0.6)
+        labels = np.zeros(m, dtype=np.int8)
+        labels[face] = 1
+        labels[edge] = 2
+        labels[corner] = 3
+        return labels
+
+    def vertex_labels(self, num_vertices, edges, corners, faces):
+        #one label per vertex: 0 unclassified, 1 face, 2 edge, 3 corner
+        labels = np.zeros(num_vertices, dtype=np.int8)
+        labels[faces] = 1
+        labels[edges] = 2
+        labels[corners] = 3
+        return labels
+
+    def label_agreement(self, labels, reference):
+        #fraction of vertices with the same label, and overlap (iou) of the edge vertices
+        edge, edge_ref = labels == 2, reference == 2
+        union = np.count_nonzero(edge | edge_ref)
+        return {
+            "agreement": np.mean(labels == reference) if len(labels) else 1.0,
+            "edge_iou": np.count_nonzero(edge & edge_ref) / union if union else 1.0,
+        }
+
+    def find_adjacency_list(self, triangles, num_vertices, hops, rows=None): 
+        #rows: only for these vertices (entry k is vertex rows[k]), with the neighbor sets kept in a dict
+        #instead of one per mesh vertex; triangles must hold every triangle within hops of them
         #for each vertex, a set of direct neighbors
-        first_hop = [set() for _ in range(num_vertices)]  
+        first_hop = [set() for _ in range(num_vertices)] if rows is None else defaultdict(set)
         for tri in triangles:
             i, j, k = tri
             first_hop[i].update([j, k]) #adds j, k vertices to the set of neighbors for vertex i
@@ -234,7 +576,7 @@ class FeatureCurves(Scene3D):
         #breadth first search
         adj_list = []
 
-        for i in range(num_vertices):
+        for i in (range(num_vertices) if rows is None else rows):
             visited = set([i])
             frontier = set([i]) #frontier of vertices to explore start with i
 
@@ -254,31 +596,9 @@ class FeatureCurves(Scene3D):
         return adj_list
     
     def group_feature_curves(self, curves, vertices):
-        features = [] # list of feature vectors
-        original_curves = []
-        symmetry_axis = np.mean(vertices[:, 0])
-        for curve in curves:
-            points = vertices[curve]
-            # feature 1: total curve length
-            length = np.sum(np.linalg.norm(np.diff(points, axis=0), axis=1))
-            # feature 2: how bendy is the curve
-            avg_curvature = self.compute_average_curvature(points)
-            # feature 3: principal axis of the curve (direction of maximum variance)
-            direction = self.compute_curve_direction_PCA(points)
-            #normalize i need only direction, scale invariant
-            direction = direction / np.linalg.norm(direction)
-           
-            #how compact is the curve
-            compactness = self.compute_compactness_2d(points)
-        
-
-            feature_vector = [ length, avg_curvature, compactness,*direction]  
-            features.append(feature_vector)
-            original_curves.append(curve)
-
-        features = np.array(features)
-        if features.ndim == 1:
-            features = np.stack(features, axis=0)
+        original_curves = list(curves)
+        # feature vectors [length, avg_curvature, compactness, *direction] of all curves at once
+        features = self.compute_curve_descriptors(curves, vertices)
         #normalization features in a vector mast be in the same scale for justice
         ''' η σύγκριση εξαρτάται από τη σχετική διαφορά των χαρακτηριστικών μεταξύ τους
          όχι από το ποιο έχει τις μεγαλύτερες αριθμητικές τιμές'''
@@ -289,6 +609,43 @@ class FeatureCurves(Scene3D):
         #groups is a list of lists of indices of curves that are highly correlated
         return original_curves, groups, features
     
+    def compute_curve_descriptors(self, curves, vertices):
+        #same features as the per-curve compute_* methods, for all curves with a few array passes
+        n = len(curves)
+        if n == 0:
+            return np.zeros((0, 6))
+        #CSR buffer: the points of all curves one after the other, curve i is points[offsets[i]:offsets[i+1]]
+        sizes = np.array([len(c) for c in curves])
+        offsets = np.concatenate(([0], np.cumsum(sizes)))
+        points = vertices[np.concatenate(curves).astype(int)]
+        curve_of_point = np.repeat(np.arange(n), sizes)
+
+        # feature 1: total curve length, from the segments that do not cross into the next curve
+        diffs = np.diff(points, axis=0)
+        seg_len = np.linalg.norm(diffs, axis=1)
+        inside = curve_of_point[1:] == curve_of_point[:-1]
+        #(bincount sums in float64, results go back to the dtype of the vertices)
+        length = np.bincount(curve_of_point[1:][inside], weights=seg_len[inside], minlength=n).astype(points.dtype)
+
+        # feature 2: how bendy is the curve
+        curvature = self.curvature_statistics(points, offsets)["mean"]
+
+        # feature 3: principal axis of the curve, from the stacked 3x3 covariance matrices
+        centroid = (np.stack([np.bincount(curve_of_point, weights=points[:, k], minlength=n) for k in range(3)], axis=1) / sizes[:, None]).astype(points.dtype)
+        centered = points - centroid[curve_of_point]
+        cov = np.add.reduceat(np.einsum("ij,ik->ijk", centered, centered), offsets[:-1], axis=0) / np.maximum(sizes - 1, 1).astype(points.dtype)[:, None, None]
+        eigvals, eigvecs = np.linalg.eigh(cov)
+        direction = eigvecs[np.arange(n), :, np.argmax(eigvals, axis=1)]
+        #normalize i need only direction, scale invariant
+        direction = direction / np.linalg.norm(direction, axis=1, keepdims=True)
+
+        #how compact is the curve, in the plane of the two largest principal directions
+        plane = eigvecs[:, :, [2, 1]]
+        projected = np.einsum("ij,ijk->ik", centered, plane[curve_of_point])
+        compactness = self.batched_hull_compactness(projected, offsets)
+
+        return np.column_stack((length, curvature, compactness, direction))
+
     #returns cosine of the angle between the two vectors
     def cosine_similarity(self, vec1, vec2):
         vec1 = np.array(vec1)
@@ -300,25 +657,65 @@ class FeatureCurves(Scene3D):
             return 0
         return dot_product / (norm1 * norm2)
 
-    def group_by_correlation(self,features, threshold):
+    def group_by_correlation(self,features, threshold, mode="greedy", block_size=1024):
+        #mode "greedy": each ungrouped curve takes every later ungrouped curve similar to it
+        #mode "components": curves linked by any chain of similar pairs end up in the same group
+        features = np.asarray(features, dtype=float)
         n = len(features) #total feature vectors(number of curves)
+        if n == 0:
+            return []
+        #unit rows once, so a row block times all rows gives cosine similarities
+        #(rows of zero norm stay zero: similarity 0, as in cosine_similarity)
+        norms = np.linalg.norm(features, axis=1, keepdims=True)
+        unit = np.divide(features, norms, out=np.zeros_like(features), where=norms > 0)
+        if mode == "greedy":
+            return self.group_greedy(unit, threshold, block_size)
+        if mode == "components":
+            return self.group_components(unit, threshold, block_size)
+        raise ValueError(f"Unknown grouping mode: {mode}")
+
+    def group_greedy(self, unit, threshold, block_size):
+        n = len(unit)
         groups = []
-        assigned = set() #index of curve already grouped
+        assigned = np.zeros(n, dtype=bool) #curves already grouped
 
-        for i in range(n):
-            if i in assigned:
+        #only block_size rows of the similarity matrix exist at a time
+        for start in range(0, n, block_size):
+            stop = min(start + block_size, n)
+            if assigned[start:stop].all():
                 continue
-            group = [i]
-            assigned.add(i)
-            for j in range(i + 1, n): #compare curve i with all the others
-                if j in assigned:
+            sims = unit[start:stop] @ unit.T
+            for i in range(start, stop):
+                if assigned[i]:
                     continue
-                corr = self.cosine_similarity(features[i], features[j])
-                if corr >= threshold:
-                    group.append(j)
-                    assigned.add(j)
-            groups.append(group)
+                #compare curve i with all the later ones at once
+                members = np.flatnonzero((sims[i - start, i + 1:] >= threshold) & ~assigned[i + 1:]) + i + 1
+                assigned[i] = True
+                assigned[members] = True
+                groups.append([i, *members.tolist()])
         return groups
+
+    def group_components(self, unit, threshold, block_size):
+        n = len(unit)
+        #representative (smallest index) of the group of every curve, like a union-find
+        parent = np.arange(n)
+        for start in range(0, n, block_size):
+            stop = min(start + block_size, n)
+            rows, cols = np.nonzero(unit[start:stop] @ unit.T >= threshold)
+            rows += start
+            keep = cols > rows
+            if not keep.any():
+                continue
+            #merge the block's edges with the groups found so far
+            graph = coo_matrix((np.ones(n + keep.sum()), (np.concatenate((np.arange(n), rows[keep])), np.concatenate((parent, cols[keep])))), shape=(n, n))
+            n_groups, labels = connected_components(graph, directed=False)
+            smallest = np.full(n_groups, n)
+            np.minimum.at(smallest, labels, np.arange(n))
+            parent = smallest[labels]
+
+        order = np.argsort(parent, kind="stable")
+        bounds = np.flatnonzero(np.diff(parent[order])) + 1
+        return [group.tolist() for group in np.split(order, bounds)]
     
     def compute_curve_direction_PCA(self,points):
         centered = points - points.mean(axis=0)
@@ -331,27 +728,134 @@ class FeatureCurves(Scene3D):
     def compute_average_curvature(self, points):
         if len(points) < 3:
             return 0
-        curvatures = []
-        for i in range(1, len(points) - 1):
-            p0, p1, p2 = points[i-1], points[i], points[i+1] #curvature for p1
-            v1 = p1 - p0
-            v2 = p2 - p1
-            angle = np.arccos(np.clip(np.dot(v1, v2) / (np.linalg.norm(v1)*np.linalg.norm(v2)), -1.0, 1.0))
-            curvature = angle / np.linalg.norm(v1) # angle per distance
-            curvatures.append(curvature)
-        return np.mean(curvatures)
+        return np.mean(self.turning_angle_curvature(points)[1:-1])
+
+    def turning_angle_curvature(self, points, offsets=None):
+        #discrete curvature of ordered polylines: turning angle at each vertex divided by the incoming segment length
+        #offsets (CSR) split points into several polylines; endpoints of each polyline get nan
+        points = np.asarray(points)
+        points = points.astype(np.result_type(points, np.float32), copy=False)
+        offsets = np.array([0, len(points)]) if offsets is None else np.asarray(offsets)
+        curvature = np.full(len(points), np.nan, dtype=points.dtype)
+        if len(points) < 3:
+            return curvature
+        curve_of_point = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+        diffs = np.diff(points, axis=0)
+        seg_len = np.linalg.norm(diffs, axis=1)
+        #vertex k+1 is interior if both its segments stay inside its polyline
+        inside = curve_of_point[1:] == curve_of_point[:-1]
+        interior = inside[1:] & inside[:-1]
+        v1, v2 = diffs[:-1][interior], diffs[1:][interior]
+        n1, n2 = seg_len[:-1][interior], seg_len[1:][interior]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            #same angle as arccos(cos), but still accurate for small angles in float32
+            angle = np.arctan2(np.linalg.norm(np.cross(v1, v2), axis=1), np.einsum("ij,ij->i", v1, v2))
+            #a zero length segment has no direction
+            angle[n1 * n2 == 0] = np.nan
+            curvature[1:-1][interior] = angle / n1 # angle per distance
+        return curvature
+
+    def curvature_statistics(self, points, offsets=None, bins=8, max_curvature=None):
+        #mean, max and normalized histogram of the curvature of every polyline
+        offsets = np.array([0, len(points)]) if offsets is None else np.asarray(offsets)
+        n = len(offsets) - 1
+        sizes = np.diff(offsets)
+        curvature = self.turning_angle_curvature(points, offsets)
+        curve_of_point = np.repeat(np.arange(n), sizes)
+        #every vertex except the two ends of its polyline
+        interior = np.ones(len(curvature), dtype=bool)
+        interior[offsets[:-1][sizes > 0]] = False
+        interior[offsets[1:][sizes > 0] - 1] = False
+        #a degenerate segment gives nan, which spoils the mean as in compute_average_curvature
+        mean = (np.bincount(curve_of_point[interior], weights=curvature[interior], minlength=n) / np.maximum(sizes - 2, 1)).astype(curvature.dtype)
+        mean[sizes < 3] = 0
+        interior &= ~np.isnan(curvature)
+        maximum = np.zeros(n)
+        np.maximum.at(maximum, curve_of_point[interior], curvature[interior])
+
+        #fixed bin edges shared by all polylines, so histograms of different curves are comparable
+        if max_curvature is None:
+            max_curvature = curvature[interior].max() if interior.any() else 1.0
+        edges = np.linspace(0, max_curvature, bins + 1)
+        bin_of_point = np.clip(np.searchsorted(edges, curvature[interior], side="right") - 1, 0, bins - 1)
+        histogram = np.bincount(curve_of_point[interior] * bins + bin_of_point, minlength=n * bins).reshape(n, bins).astype(float)
+        histogram /= np.maximum(histogram.sum(axis=1, keepdims=True), 1)
+        return {"mean": mean, "max": maximum, "histogram": histogram, "edges": edges}
     
 
     def compute_compactness_2d(self, points):
         if len(points) < 3:
             return 0
         centered = points - points.mean(axis=0)
-        #singular value decomposition
-        # rows of vh are vectors -> principal directions of the point cloud of the curve
-        _, _, vh = np.linalg.svd(centered)
+        #eigenvectors of the 3x3 covariance -> principal directions of the point cloud of the curve
+        #(same directions as an svd of the points, without decomposing the whole point matrix)
+        _, eigvecs = np.linalg.eigh(centered.T @ centered)
         # projection of points in 2 principal Directions
-        projected = centered @ vh[:2].T
-
+        projected = centered @ eigvecs[:, [2, 1]]
+        return self.hull_compactness(projected)
+
+    def batched_hull_compactness(self, projected, offsets, max_small=64):
+        #hull_compactness of every curve (CSR offsets); curves up to max_small points share one
+        #vectorized monotone chain, larger ones go to Qhull
+        sizes = np.diff(offsets)
+        compactness = np.zeros(len(sizes), dtype=projected.dtype)
+        small = np.flatnonzero((sizes >= 3) & (sizes <= max_small))
+        for i in np.flatnonzero(sizes > max_small):
+            compactness[i] = self.hull_compactness(projected[offsets[i]:offsets[i + 1]])
+        if len(small) == 0:
+            return compactness
+
+        #pad the small curves to one (curves, points, 2) array, padding sorts last and is skipped
+        width = sizes[small].max()
+        valid = np.arange(width)[None, :] < sizes[small][:, None]
+        index = np.where(valid, offsets[small][:, None] + np.arange(width)[None, :], 0)
+        P = np.where(valid[:, :, None], projected[index], np.inf)
+        order = np.lexsort((P[:, :, 1], P[:, :, 0]), axis=-1)
+        P = np.take_along_axis(P, order[:, :, None], axis=1)
+
+        area = np.zeros(len(small), dtype=projected.dtype)
+        perimeter = np.zeros(len(small), dtype=projected.dtype)
+        #lower chain left to right, upper chain right to left; together they close the hull
+        for columns in (range(width), range(width - 1, -1, -1)):
+            hull, top = self.monotone_chain(P, valid, columns)
+            a, b = hull[:, :-1], hull[:, 1:]
+            edge = np.arange(width - 1)[None, :] < (top - 1)[:, None]
+            area += np.where(edge, a[:, :, 0] * b[:, :, 1] - a[:, :, 1] * b[:, :, 0], 0).sum(axis=1)
+            perimeter += np.where(edge, np.linalg.norm(b - a, axis=2), 0).sum(axis=1)
+        area = np.abs(area) / 2
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            compactness[small] = np.where(perimeter > 0, area / perimeter ** 2, 0)
+        return compactness
+
+    def monotone_chain(self, P, valid, columns):
+        #one half of andrew's monotone chain for many sorted point sets at once, one stack per set
+        k = len(P)
+        rows = np.arange(k)
+        hull = np.zeros((k, P.shape[1], 2), dtype=P.dtype)
+        top = np.zeros(k, dtype=int)
+        #padding points are inf, their (ignored) cross products may be nan
+        with np.errstate(invalid="ignore"):
+            for j in columns:
+                p = P[:, j]
+                active = valid[:, j]
+                while True:
+                    a = hull[rows, np.maximum(top - 2, 0)]
+                    b = hull[rows, np.maximum(top - 1, 0)]
+                    cross = (b[:, 0] - a[:, 0]) * (p[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (p[:, 0] - a[:, 0])
+                    #pop while the last two hull points and p do not turn counter-clockwise
+                    pop = active & (top >= 2) & (cross <= 0)
+                    if not pop.any():
+                        break
+                    top[pop] -= 1
+                hull[rows[active], top[active]] = p[active]
+                top[active] += 1
+        return hull, top
+
+    def hull_compactness(self, projected):
+        #area / perimeter^2 of the convex hull of 2d points
+        if len(projected) < 3:
+            return 0
         try:
             hull = ConvexHull(projected)
             area = hull.volume
@@ -364,7 +868,99 @@ class FeatureCurves(Scene3D):
             return area / (perimeter ** 2)
         except:
             return 0
+
+
+class FeatureCurves(FeaturePipeline, Scene3D):
+    def __init__(self, mode="pca", patches="hops"):
+        super().__init__(WIDTH, HEIGHT, "Project")
+        #vertex classification and patch modes, see classify_vertices
+        self.mode = mode
+        self.patches = patches
+
+    def load_model(self, path):
+        self.model = Mesh3D(path, color=Color.GRAY)
+        self.addShape(self.model, "model")
+        return self.model
+
+
+    def reset(self):
+        self.adg_list_onehop = self.find_adjacency_list(self.model.triangles, len(self.model.vertices), hops=1)       
+        self.Task1_classify_vertices()
  
+        self.curves = self.extract_feature_curves(self.edges,self.model.vertices)
+        #self.Task2_3_colored_feature_curves()
+        original_curves, groups, features = self.group_feature_curves(self.curves, self.model.vertices)
+        self.features = features  # αποθήκευση σε attribute
+        self.groups = groups
+        self.original_curves = original_curves
+       
+        self.Task4_group_feature_curves()
+
+      
+    def Task1_classify_vertices(self):
+        self.edges, self.corners, self.faces = self.classify_vertices(self.model.vertices, self.model.triangles, self.mode, self.model.triangle_normals, self.model.vertex_normals, self.patches)
+        print(f"Points in edges: {len(self.edges)},Points in Corners: {len(self.corners)}, Points in Faces: {len(self.faces)}")
+        vc = self.model.vertex_colors
+        vc[self.faces] = (0, 0, 1) #blue
+        vc[self.edges] = (0, 1, 0) #green
+        vc[self.corners] = (1, 0, 0) #red
+        self.model.vertex_colors =vc
+        self.updateShape("model")
+
+    def Task2_3_colored_feature_curves(self):
+        
+        vertices = self.model.vertices  
+        print(f"Curves: {len(self.curves)}")
+        for idx, curve in enumerate(self.curves):
+            line_segments = []
+
+            ordered_curve = self.order_curve_points(curve, self.adg_list_onehop)
+            curve_points = np.array([vertices[v] for v in ordered_curve])
+            
+            max_dist = 0.05 
+
+            for i in range(len(curve_points) - 1):
+                p1 = curve_points[i]
+                p2 = curve_points[i + 1]
+                dist = np.linalg.norm(p1 - p2)
+
+                if dist < max_dist:
+                    line_segments.append([i, i + 1])
+
+            # each curve has different color
+            color = (random(), random(), random())
+
+            lineset = LineSet3D(points=curve_points.tolist(), lines=line_segments, width=3, color=color)
+            self.addShape(lineset, f"feature_curve_{idx}")
+
+
+    def Task4_group_feature_curves(self):
+        vertices = self.model.vertices
+        print(f"Objects: {len(self.groups)}")
+        
+        for group_idx, group in enumerate(self.groups):
+            color = (random(), random(), random())  
+
+            for curve_idx in group:
+                line_segments =[]
+                curve = self.original_curves[curve_idx]
+                ordered_curve = self.order_curve_points(curve, self.adg_list_onehop)
+                curve_points = np.array([vertices[v] for v in ordered_curve])
+                max_dist = 0.05 
+
+                for i in range(len(curve_points) - 1):
+                    p1 = curve_points[i]
+                    p2 = curve_points[i + 1]
+                    dist = np.linalg.norm(p1 - p2)
+
+                    if dist < max_dist:
+                        line_segments.append([i, i + 1])
+
+                lineset = LineSet3D(points=curve_points.tolist(), lines=line_segments, width=3, color=color)
+                name = f"group_{group_idx}_curve_{curve_idx}"
+                self.addShape(lineset, name)
+
+                
 if __name__ == "__main__":
     app =FeatureCurves()
     app.load_model("tea_cup.ply")
@@ -1,8 +1,147 @@
-from feature_extractor import FeatureCurves
+from feature_extractor import FeatureCurves, extract_features
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from scipy.optimize import linear_sum_assignment
+from scipy.sparse import coo_matrix, csr_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
 import numpy as np
+import os
+
+class CurveMatcher:
+    #comparison of curve feature matrices; needs no window, so it is shared by all comparators
+
+    def compare_models(self, featuresA, featuresB, threshold=0.9):
+        #pearson correlation of every curve of A with every curve of B
+        corr = self.similarity_matrix(featuresA, featuresB)
+        #rows: A curves against B, columns: B curves against A
+        score_AB = self.one_way_score(corr, threshold)
+        score_BA = self.one_way_score(corr.T, threshold)
+        return (score_AB + score_BA) / 2
+
+    def one_way_score(self, corr, threshold):
+        if corr.shape[0] == 0:
+            return 0
+        best = self.best_matches(corr)
+        # if the best similarity is over threshold there is a match
+        matches = np.count_nonzero(best >= threshold)
+        # returns percent of source curves that match with target curves
+        return matches / corr.shape[0]
+
+    def compare_models_assignment(self, featuresA, featuresB, threshold=0.9, sparse=False):
+        #like compare_models, but every curve can be matched with at most one curve of the other model
+        A = self.standardize_rows(featuresA)
+        B = self.standardize_rows(featuresB)
+        if len(A) == 0 or len(B) == 0:
+            return 0.0
+        if sparse:
+            rows, cols, sims = self.candidate_pairs(A, B, threshold)
+        else:
+            corr = np.clip(A @ B.T, -1, 1)
+            with np.errstate(invalid="ignore"):
+                rows, cols = np.nonzero(corr >= threshold)
+            sims = corr[rows, cols]
+        matches = len(self.assign_pairs(rows, cols, sims, len(A), len(B))[0])
+        return (matches / len(A) + matches / len(B)) / 2
+
+    def candidate_pairs(self, A, B, threshold):
+        #pairs above threshold from a radius search: for unit rows, corr >= t  <=>  distance <= sqrt(2 - 2t)
+        validA = np.nonzero(~np.isnan(A).any(axis=1))[0]
+        validB = np.nonzero(~np.isnan(B).any(axis=1))[0]
+        if len(validA) == 0 or len(validB) == 0:
+            return np.zeros(0, dtype=int), np.zeros(0, dtype=int), np.zeros(0)
+        radius = np.sqrt(max(2 - 2 * threshold, 0))
+        dist = cKDTree(A[validA]).sparse_distance_matrix(cKDTree(B[validB]), radius, output_type="coo_matrix")
+        return validA[dist.row], validB[dist.col], 1 - dist.data ** 2 / 2
+
+    def assign_pairs(self, rows, cols, sims, nA, nB):
+        #maximum one-to-one matching of the candidate pairs, solved separately in each connected component
+        if len(rows) == 0:
+            return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+        graph = coo_matrix((np.ones(len(rows)), (rows, cols + nA)), shape=(nA + nB, nA + nB))
+        _, labels = connected_components(graph, directed=False)
+        edge_labels = labels[rows]
+        order = np.argsort(edge_labels, kind="stable")
+        bounds = np.flatnonzero(np.diff(edge_labels[order])) + 1
+        #a big constant per pair makes the number of matches count first and similarity only break ties
+        big = 2 * min(nA, nB) + 1
+        matched_rows, matched_cols = [], []
+        for edges in np.split(order, bounds):
+            if len(edges) == 1:
+                matched_rows.append(rows[edges])
+                matched_cols.append(cols[edges])
+                continue
+            r, r_local = np.unique(rows[edges], return_inverse=True)
+            c, c_local = np.unique(cols[edges], return_inverse=True)
+            weights = np.zeros((len(r), len(c)))
+            weights[r_local, c_local] = big + sims[edges]
+            ri, ci = linear_sum_assignment(weights, maximize=True)
+            keep = weights[ri, ci] > 0
+            matched_rows.append(r[ri[keep]])
+            matched_cols.append(c[ci[keep]])
+        return np.concatenate(matched_rows), np.concatenate(matched_cols)
+
+    def best_matches(self, corr):
+        #best similarity of each source curve (row), nan if it has no target
+        if corr.shape[1] == 0:
+            return np.full(corr.shape[0], np.nan)
+        #nan treated like python's max: a nan first wins, later nans are skipped
+        best = np.where(np.isnan(corr), -np.inf, corr).max(axis=1)
+        best[np.isnan(corr[:, 0])] = np.nan
+        return best
+
+    def threshold_sweep(self, featuresA, featuresB, thresholds=None):
+        #compare_models score for many thresholds from a single similarity matrix
+        #thresholds=None gives the exact step function: the score at a breakpoint holds down to the previous breakpoint
+        corr = self.similarity_matrix(featuresA, featuresB)
+        best_AB = self.best_matches(corr)
+        best_BA = self.best_matches(corr.T)
+        if thresholds is None:
+            thresholds = np.unique(np.concatenate((best_AB, best_BA)))
+            thresholds = thresholds[~np.isnan(thresholds)]
+        thresholds = np.asarray(thresholds, dtype=float)
+
+        def one_way(best):
+            if len(best) == 0:
+                return np.zeros(len(thresholds))
+            #nan never matches, it is left out of the sorted list
+            matched = np.sort(best[~np.isnan(best)])
+            matches = len(matched) - np.searchsorted(matched, thresholds, side="left")
+            return matches / len(best)
+
+        return thresholds, (one_way(best_AB) + one_way(best_BA)) / 2
+
+    def similarity_matrix(self, featuresA, featuresB):
+        #rows are centered and scaled to unit length once, then one matmul gives all pearson correlations
+        A = self.standardize_rows(featuresA)
+        B = self.standardize_rows(featuresB)
+        corr = A @ B.T
+        #same clipping as np.corrcoef
+        return np.clip(corr, -1, 1)
+
+    def standardize_rows(self, features):
+        features = np.asarray(features, dtype=float)
+        if features.size == 0:
+            return np.zeros((0, features.shape[-1] if features.ndim == 2 else 0))
+        features = np.atleast_2d(features)
+        centered = features - features.mean(axis=1, keepdims=True)
+        norms = np.linalg.norm(centered, axis=1, keepdims=True)
+        #constant rows have no correlation, np.corrcoef gives nan for them
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return centered / norms
+
+    def pearson_correlation(self, vec1, vec2):
+        return np.corrcoef(vec1, vec2)[0, 1]
+
+
+class MeshComparator(CurveMatcher):
+    def __init__(self, path1, path2, parallel=False):
+        if parallel:
+            #each model is processed in its own worker process, only the feature matrices come back
+            self.modelA = self.modelB = None
+            with ProcessPoolExecutor(max_workers=2) as executor:
+                self.featuresA, self.featuresB = executor.map(extract_features, (path1, path2))
+            return
 
-class MeshComparator:
-    def __init__(self, path1, path2):
         self.modelA = FeatureCurves()
         self.modelB = FeatureCurves()
         self.modelA.model = self.modelA.load_model(path1)
@@ -10,36 +149,142 @@ class MeshComparator:
 
         self.modelA.reset()
         self.modelB.reset()
-
-    def compare_models(self, featuresA, featuresB, threshold=0.9):
-        def one_way_score(source, target):
-            #counter of source curves that match with target curves
-            matches = 0
-            #for each curve of source find similarity with every curve of target
-            for vecA in source:
-                similarities = [self.pearson_correlation(vecA, vecB) for vecB in target]
-                # if the best similarity is over threshold there is a match
-                if similarities and max(similarities) >= threshold:
-                    matches += 1
-             # returns percent of source curves that match with target curves
-            return matches / len(source) if len(source) > 0 else 0
-
-        score_AB = one_way_score(featuresA, featuresB)
-        score_BA = one_way_score(featuresB, featuresA)
-        return (score_AB + score_BA) / 2
-    
-    def pearson_correlation(self, vec1, vec2):
-        return np.corrcoef(vec1, vec2)[0, 1]
+        self.featuresA = self.modelA.features
+        self.featuresB = self.modelB.features
 
     def run(self):
-        featuresA = self.modelA.features
-        featuresB = self.modelB.features
+        featuresA = self.featuresA
+        featuresB = self.featuresB
         similarity = self.compare_models(featuresA, featuresB)
         print(f"Similarity score: {similarity * 100:.2f}%")
 
+
+class DescriptorStore:
+    #curve feature matrix of every model, extracted once per mesh file
+    def __init__(self, path=None):
+        self.features = {}
+        self.path = path
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def __contains__(self, model_path):
+        return os.path.abspath(model_path) in self.features
+
+    def __len__(self):
+        return len(self.features)
+
+    def get(self, model_path):
+        key = os.path.abspath(model_path)
+        if key not in self.features:
+            self.features[key] = extract_features(model_path)
+        return self.features[key]
+
+    def extract(self, model_paths, workers=None):
+        #missing models are extracted in parallel worker processes
+        missing = list(dict.fromkeys(os.path.abspath(p) for p in model_paths if p not in self))
+        if not missing:
+            return
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for key, features in zip(missing, executor.map(extract_features, missing)):
+                self.features[key] = features
+
+    def add(self, model_path, features):
+        self.features[os.path.abspath(model_path)] = np.asarray(features, dtype=float).reshape(-1, 6)
+
+    def save(self, path=None):
+        path = self.path if path is None else path
+        paths = list(self.features)
+        counts = np.array([len(self.features[p]) for p in paths], dtype=int)
+        #all matrices stacked, with the curve count of each model to split them again
+        stacked = np.vstack([self.features[p] for p in paths]) if counts.sum() > 0 else np.zeros((0, 6))
+        np.savez(path, paths=np.array(paths, dtype=str), counts=counts, features=stacked)
+
+    def load(self, path):
+        data = np.load(path)
+        offsets = np.concatenate(([0], np.cumsum(data["counts"])))
+        for i, p in enumerate(data["paths"]):
+            self.features[str(p)] = data["features"][offsets[i]:offsets[i + 1]]
+
+
+class CatalogComparator(CurveMatcher):
+    #similarity of many models against many, with the same score as compare_models
+    def __init__(self, store=None):
+        self.store = DescriptorStore() if store is None else store
+
+    def similarity(self, queries, library=None, threshold=0.9, top_k=None, block_curves=4096, workers=None):
+        #library=None compares the queries with each other (N x N)
+        library = queries if library is None else library
+        self.store.extract(list(queries) + list(library), workers)
+        Q, q_counts = self.stack_models(queries)
+        L, l_counts = self.stack_models(library)
+        blocks = self.model_blocks(q_counts, block_curves)
+
+        def row_slab(block):
+            start, stop = block
+            rows = np.zeros((stop - start, len(library)))
+            q0, q1 = q_counts[:start].sum(), q_counts[:stop].sum()
+            for l_start, l_stop in self.model_blocks(l_counts, block_curves):
+                l0, l1 = l_counts[:l_start].sum(), l_counts[:l_stop].sum()
+                rows[:, l_start:l_stop] = self.block_scores(Q[q0:q1], q_counts[start:stop], L[l0:l1], l_counts[l_start:l_stop], threshold)
+            if top_k is None:
+                return rows
+            #keep only the k best library models of each query
+            k = min(top_k, rows.shape[1])
+            best = np.argpartition(-rows, k - 1, axis=1)[:, :k] if k > 0 else np.zeros((len(rows), 0), dtype=int)
+            best = np.take_along_axis(best, np.argsort(-np.take_along_axis(rows, best, axis=1), axis=1), axis=1)
+            return best, np.take_along_axis(rows, best, axis=1)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            slabs = list(executor.map(row_slab, blocks))
+
+        if top_k is None:
+            return np.vstack(slabs) if slabs else np.zeros((0, len(library)))
+        indices = np.vstack([s[0] for s in slabs]) if slabs else np.zeros((0, 0), dtype=int)
+        scores = np.vstack([s[1] for s in slabs]) if slabs else np.zeros((0, 0))
+        indptr = np.arange(len(queries) + 1) * indices.shape[1]
+        return csr_matrix((scores.ravel(), indices.ravel(), indptr), shape=(len(queries), len(library)))
+
+    def stack_models(self, model_paths):
+        mats = [self.standardize_rows(self.store.get(p)) for p in model_paths]
+        counts = np.array([len(m) for m in mats], dtype=int)
+        stacked = np.vstack([m for m in mats if len(m) > 0]) if counts.sum() > 0 else np.zeros((0, 6))
+        return stacked, counts
+
+    def model_blocks(self, counts, block_curves):
+        #consecutive models grouped so that a block holds about block_curves curves
+        blocks = []
+        start, total = 0, 0
+        for i, c in enumerate(counts):
+            if total > 0 and total + c > block_curves:
+                blocks.append((start, i))
+                start, total = i, 0
+            total += c
+        if start < len(counts):
+            blocks.append((start, len(counts)))
+        return blocks
+
+    def block_scores(self, Q, q_counts, L, l_counts, threshold):
+        scores = np.zeros((len(q_counts), len(l_counts)))
+        #models without curves never match anything
+        q_has, l_has = q_counts > 0, l_counts > 0
+        if not q_has.any() or not l_has.any():
+            return scores
+        q_off = np.concatenate(([0], np.cumsum(q_counts[q_has])[:-1]))
+        l_off = np.concatenate(([0], np.cumsum(l_counts[l_has])[:-1]))
+
+        corr = np.clip(Q @ L.T, -1, 1)
+        corr[np.isnan(corr)] = -np.inf
+        #best match of each query curve inside each library model, and the other way round
+        row_best = np.maximum.reduceat(corr, l_off, axis=1) >= threshold
+        col_best = np.maximum.reduceat(corr, q_off, axis=0) >= threshold
+        score_AB = np.add.reduceat(row_best.astype(int), q_off, axis=0) / q_counts[q_has, None]
+        score_BA = np.add.reduceat(col_best.astype(int), l_off, axis=1) / l_counts[None, l_has]
+        scores[np.ix_(q_has, l_has)] = (score_AB + score_BA) / 2
+        return scores
+
 if __name__ == "__main__":
-  
+
     model_path1 = "portrait1.ply"
     model_path2 = "portrait2.ply"
     comparator = MeshComparator(model_path1, model_path2)
-    comparator.run()
\ No newline at end of file
+    comparator.run()
@@ -0,0 +1,109 @@
+from mesh_comparator import CurveMatcher, DescriptorStore
+from scipy.spatial import cKDTree
+import numpy as np
+
+class ShapeIndex(CurveMatcher):
+    #retrieval of the most similar models of a library for a query model
+    #standardized rows are unit vectors, so pearson correlation >= t  <=>  distance <= sqrt(2 - 2t);
+    #a radius search over all library curves finds exactly the curve pairs compare_models would count
+    def __init__(self, store=None, rebuild_ratio=0.1):
+        self.store = DescriptorStore() if store is None else store
+        #fraction of pending curves (not yet in the tree) that triggers a rebuild
+        self.rebuild_ratio = rebuild_ratio
+        self.names = []
+        self.counts = []
+        #curves in the tree, and the owner (model index) of each one
+        self.curves = np.zeros((0, 6))
+        self.owners = np.zeros(0, dtype=int)
+        #curves added since the last rebuild, kept as one chunk per model so adding never copies the index
+        self.pending_curves = []
+        self.pending_owners = []
+        self.pending_count = 0
+        self.tree = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def add_model(self, path):
+        self.add(path, self.store.get(path))
+
+    def add(self, name, features):
+        curves = self.standardize_rows(features)
+        #constant rows have no correlation with anything, they only count in the curve total
+        valid = curves[~np.isnan(curves).any(axis=1)] if len(curves) else curves.reshape(0, 6)
+        self.names.append(name)
+        self.counts.append(len(curves))
+        self.pending_curves.append(valid)
+        self.pending_owners.append(np.full(len(valid), len(self.names) - 1))
+        self.pending_count += len(valid)
+        #new curves wait in a small brute-force buffer until there are enough of them; the tree grows
+        #by a constant factor each time, so the copies add up to linear time overall
+        if self.pending_count > self.rebuild_ratio * max(len(self.curves), 1):
+            self.rebuild()
+
+    def rebuild(self):
+        self.curves = np.vstack([self.curves, *self.pending_curves])
+        self.owners = np.concatenate([self.owners, *self.pending_owners])
+        self.pending_curves, self.pending_owners, self.pending_count = [], [], 0
+        self.tree = cKDTree(self.curves) if len(self.curves) else None
+
+    def pairs(self, query_curves, radius):
+        #(query curve, library curve) index pairs closer than radius
+        pairs = []
+        if self.tree is not None and len(query_curves):
+            for i, hits in enumerate(self.tree.query_ball_point(query_curves, radius, workers=-1)):
+                pairs.append(np.stack((np.full(len(hits), i), np.asarray(hits, dtype=int)), axis=1))
+        if self.pending_count and len(query_curves):
+            pending = np.vstack(self.pending_curves)
+            q, l = np.nonzero(query_curves @ pending.T >= 1 - radius ** 2 / 2)
+            pairs.append(np.stack((q, l + len(self.curves)), axis=1))
+        return np.vstack(pairs) if pairs else np.zeros((0, 2), dtype=int)
+
+    def query(self, features, k=10, threshold=0.9):
+        #k best (name, score) pairs, score as in compare_models
+        curves = self.standardize_rows(features)
+        n_query = len(curves)
+        if n_query == 0 or len(self) == 0:
+            return []
+        radius = np.sqrt(max(2 - 2 * threshold, 0))
+        valid_rows = np.nonzero(~np.isnan(curves).any(axis=1))[0]
+        pairs = self.pairs(curves[valid_rows], radius)
+        q, l = valid_rows[pairs[:, 0]], pairs[:, 1]
+        owners = np.concatenate([self.owners, *self.pending_owners])
+        counts = np.asarray(self.counts)
+        owner = owners[l]
+
+        #query curves with a match inside each model, and curves of each model with a match in the query
+        score_AB = np.bincount(np.unique(owner * n_query + q) // n_query, minlength=len(self)) / n_query
+        matched = np.bincount(owners[np.unique(l)], minlength=len(self))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            score_BA = np.where(counts > 0, matched / counts, 0)
+        scores = (score_AB + score_BA) / 2
+
+        k = min(k, len(self))
+        best = np.argsort(-scores, kind="stable")[:k]
+        return [(self.names[i], scores[i]) for i in best]
+
+    def save(self, path):
+        curves = np.vstack([self.curves, *self.pending_curves])
+        owners = np.concatenate([self.owners, *self.pending_owners])
+        np.savez(path, names=np.array(self.names, dtype=str), counts=np.array(self.counts, dtype=int), curves=curves, owners=owners)
+
+    @classmethod
+    def load(cls, path, store=None):
+        data = np.load(path)
+        index = cls(store)
+        index.names = [str(n) for n in data["names"]]
+        index.counts = data["counts"].tolist()
+        index.curves = data["curves"]
+        index.owners = data["owners"]
+        index.rebuild()
+        return index
+
+if __name__ == "__main__":
+
+    index = ShapeIndex()
+    for path in ("portrait1.ply", "portrait2.ply", "tea_cup.ply"):
+        index.add_model(path)
+    for name, score in index.query(index.store.get("portrait1.ply"), k=3):
+        print(f"{name}: {score * 100:.2f}%")
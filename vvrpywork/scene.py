@@ -28,6 +28,9 @@ Tuple3 = tuple[Number, Number, Number]
 Shape = Any
 ShapeSet = Any
 
+# maximum number of released primitives (all kinds and circle sizes together) that Scene2D keeps for reuse
+SHAPE_POOL_SIZE = 4096
+
 MouseType = Any
 KeyType = Any
 ModifierType = Any
@@ -60,6 +63,8 @@ class Scene2D:
         self._shapeDict = {}
         self._shapeBatch = pyglet.graphics.Batch()
         self._layer = 0
+        self._shapePool = {}
+        self._shapePoolSize = 0
 
         layout_vertex_source = """#version 330 core
             in vec3 position;
@@ -134,6 +139,73 @@ class Scene2D:
 
         self._text_shader = pyglet.gl.current_context.create_program((layout_vertex_source, "vertex"), (layout_fragment_source, "fragment"))
 
+        # plain colored triangles, used by batched shape sets that keep all their vertices in one vertex list
+        batch_vertex_source = """#version 330 core
+            in vec2 position;
+            in vec4 colors;
+
+            out vec4 vertex_colors;
+
+            uniform WindowBlock
+            {
+                mat4 projection;
+                mat4 view;
+            } window;
+
+            void main()
+            {
+                gl_Position = window.projection * window.view * vec4(position, 0.0, 1.0);
+                vertex_colors = colors;
+            }
+        """
+        batch_fragment_source = """#version 330 core
+            in vec4 vertex_colors;
+
+            out vec4 final_colors;
+
+            void main()
+            {
+                final_colors = vertex_colors;
+            }
+        """
+
+        self._batch_shader = pyglet.gl.current_context.create_program((batch_vertex_source, "vertex"), (batch_fragment_source, "fragment"))
+
+        # round points, one vertex each, used by batched point sets; size is the radius in scene units
+        point_vertex_source = """#version 330 core
+            in vec2 position;
+            in vec4 colors;
+            in float size;
+
+            out vec4 vertex_colors;
+
+            uniform WindowBlock
+            {
+                mat4 projection;
+                mat4 view;
+            } window;
+
+            void main()
+            {
+                gl_Position = window.projection * window.view * vec4(position, 0.0, 1.0);
+                gl_PointSize = 2.0 * size * window.view[0][0];
+                vertex_colors = colors;
+            }
+        """
+        point_fragment_source = """#version 330 core
+            in vec4 vertex_colors;
+
+            out vec4 final_colors;
+
+            void main()
+            {
+                if (length(gl_PointCoord - vec2(0.5)) > 0.5) discard;
+                final_colors = vertex_colors;
+            }
+        """
+
+        self._point_shader = pyglet.gl.current_context.create_program((point_vertex_source, "vertex"), (point_fragment_source, "fragment"))
+
         self._window.on_draw = self.__on_draw
         self._window.on_mouse_press = self.__on_mouse_press
         self._window.on_mouse_drag = self.__on_mouse_drag
@@ -265,13 +337,81 @@ class Scene2D:
     def removeShape(self, name:str):
         '''Removes a shape from the scene.
 
+        The shape's primitives are released from the batch; circles,
+        lines and triangles are kept aside (hidden) and reused by shapes
+        added later.
+
         Args:
             name: Name of the shape to remove.
         '''
         if name in self._shapeDict:
-            # self._shapeDict[name].delete()
+            self._releaseShapes(self._shapeDict[name]["shape"])
             del self._shapeDict[name]
 
+    def _poolKey(self, shape):
+        if type(shape) is pyglet.shapes.Circle:
+            return (pyglet.shapes.Circle, shape._segments)
+        if type(shape) in (pyglet.shapes.Line, pyglet.shapes.Triangle):
+            return type(shape)
+        return None
+
+    def _releaseShapes(self, shape):
+        if isinstance(shape, (list, tuple)):
+            for s in shape:
+                self._releaseShapes(s)
+            return
+        key = self._poolKey(shape)
+        if key is not None and self._shapePoolSize < SHAPE_POOL_SIZE:
+            shape.visible = False
+            self._shapePool.setdefault(key, []).append(shape)
+            self._shapePoolSize += 1
+        else:
+            shape.delete()
+
+    def _reuseShape(self, key):
+        pool = self._shapePool.get(key)
+        if not pool:
+            return None
+        shape = pool.pop()
+        self._shapePoolSize -= 1
+        shape.group = pyglet.graphics.Group(self._layer)
+        shape.visible = True
+        return shape
+
+    def _newCircle(self, x:Number, y:Number, radius:Number, segments:None|int, color:tuple) -> pyglet.shapes.Circle:
+        # same segment count pyglet would pick, so that a pooled circle looks identical to a new one
+        segments = segments or max(14, int(radius / 1.25))
+        shape = self._reuseShape((pyglet.shapes.Circle, segments))
+        if shape is None:
+            return pyglet.shapes.Circle(x, y, radius, segments, color, batch=self._shapeBatch, group=pyglet.graphics.Group(self._layer))
+        shape.position = (x, y)
+        shape.radius = radius
+        shape.color = color
+        return shape
+
+    def _newLine(self, x1:Number, y1:Number, x2:Number, y2:Number, width:Number, color:tuple) -> pyglet.shapes.Line:
+        shape = self._reuseShape(pyglet.shapes.Line)
+        if shape is None:
+            return pyglet.shapes.Line(x1, y1, x2, y2, width, color, batch=self._shapeBatch, group=pyglet.graphics.Group(self._layer))
+        shape.position = (x1, y1)
+        shape.x2 = x2
+        shape.y2 = y2
+        shape.width = width
+        shape.color = color
+        return shape
+
+    def _newTriangle(self, x1:Number, y1:Number, x2:Number, y2:Number, x3:Number, y3:Number, color:tuple) -> pyglet.shapes.Triangle:
+        shape = self._reuseShape(pyglet.shapes.Triangle)
+        if shape is None:
+            return pyglet.shapes.Triangle(x1, y1, x2, y2, x3, y3, color, batch=self._shapeBatch, group=pyglet.graphics.Group(self._layer))
+        shape.position = (x1, y1)
+        shape.x2 = x2
+        shape.y2 = y2
+        shape.x3 = x3
+        shape.y3 = y3
+        shape.color = color
+        return shape
+
 
 class Scene3D:
     '''A class representing a 3D Scene.
@@ -15,6 +15,8 @@ from .sphere3d import Sphere3D
 from .cuboid3d import Cuboid3D
 from .cuboid3d_generalized import Cuboid3DGeneralized
 from .pointset3d import PointSet3D
+from .markerset3d import MarkerSet3D
 from .lineset3d import LineSet3D
+from .tubeset3d import TubeSet3D
 from .mesh3d import Mesh3D
 from .label3d import Label3D
\ No newline at end of file
@@ -1,6 +1,7 @@
 from .types import NDArray3, List3, Tuple3, ColorType, Number
 from .line3d import Line3D
 from .point3d import Point3D
+from . import templates
 from vvrpywork.scene import Scene3D
 
 from math import acos
@@ -30,9 +31,7 @@ class Arrow3D(Line3D):
     def _addToScene(self, scene:Scene3D, name:None|str):
         name = str(id(self)) if name is None else name
         scene._shapeDict[name] = self
-        shape = o3d.geometry.TriangleMesh.create_arrow(0.005 * self.width, 2 * 0.005 * self.width, (1 - self.cone_to_cylinder_ratio) * self.length(), self.cone_to_cylinder_ratio * self.length(), self.resolution)
-        shape.translate((0, 0, -self.length()/2))
-        shape.compute_vertex_normals()
+        shape = templates.arrow(self.resolution, 0.005 * self.width, self.length(), self.cone_to_cylinder_ratio)
 
         v = np.array(((self.x2-self.x1)/self.length(), (self.y2-self.y1)/self.length(), (self.z2-self.z1)/self.length()))
         z = np.array((0., 0., 1.))
@@ -46,7 +46,7 @@ class Circle2D(Shape):
     def _addToScene(self, scene:Scene2D, name:None|str):
         if self.filled:
             name = str(id(self)) if name is None else name
-            shape = Circle(100 * self.x, 100 * self.y, 100 * self.radius, self.resolution, tuple(int(255 * _ + 0.5) for _ in self.color), batch=scene._shapeBatch, group=Group(scene._layer))
+            shape = scene._newCircle(100 * self.x, 100 * self.y, 100 * self.radius, self.resolution, tuple(int(255 * _ + 0.5) for _ in self.color))
             scene._shapeDict[name] = {"class": self, "shape": shape}
         else:
             name = str(id(self)) if name is None else name
@@ -1,6 +1,7 @@
 from .abstract import Shape
 from .types import NDArray3, List3, Tuple3, ColorType, Number
 from .point3d import Point3D
+from . import templates
 from vvrpywork.scene import Scene3D
 
 import numpy as np
@@ -75,9 +76,7 @@ class Cuboid3D(Shape):
         material = rendering.MaterialRecord()
         material.shader = "defaultLitTransparency"
         if self.filled:
-            shape = o3d.geometry.TriangleMesh.create_box(1, 1, 1)
-            shape.translate((-0.5, -0.5, -0.5))
-            shape.compute_vertex_normals()
+            shape = templates.box()
         else:
             vertices = np.array(((-0.5, -0.5, -0.5),
                                  (0.5, -0.5, -0.5),
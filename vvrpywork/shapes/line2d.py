@@ -5,7 +5,6 @@ from vvrpywork.scene import Scene2D
 
 from numpy import ndarray
 from pyglet.shapes import Line
-from pyglet.graphics import Group
 
 
 class Line2D(Shape):
@@ -51,7 +50,7 @@ class Line2D(Shape):
     
     def _addToScene(self, scene:Scene2D, name:None|str):
         name = str(id(self)) if name is None else name
-        shape = Line(100 * self.x1, 100 * self.y1, 100 * self.x2, 100 * self.y2, self.width, tuple(int(255 * _ + 0.5) for _ in self.color), batch=scene._shapeBatch, group=Group(scene._layer))
+        shape = scene._newLine(100 * self.x1, 100 * self.y1, 100 * self.x2, 100 * self.y2, self.width, tuple(int(255 * _ + 0.5) for _ in self.color))
         scene._shapeDict[name] = {"class": self, "shape": shape}
 
     def _update(self, shape:Line, scene:Scene2D):
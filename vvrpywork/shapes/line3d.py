@@ -1,6 +1,7 @@
 from .abstract import Shape
 from .types import NDArray3, List3, Tuple3, ColorType, Number
 from .point3d import Point3D
+from . import templates
 from vvrpywork.scene import Scene3D
 
 from math import acos
@@ -65,8 +66,7 @@ class Line3D(Shape):
     def _addToScene(self, scene:Scene3D, name:None|str):
         name = str(id(self)) if name is None else name
         scene._shapeDict[name] = self
-        shape = o3d.geometry.TriangleMesh.create_cylinder(0.005 * self.width, self.length(), self.resolution)
-        shape.compute_vertex_normals()
+        shape = templates.cylinder(self.resolution, 0.005 * self.width, self.length())
 
         v = np.array(((self.x2-self.x1)/self.length(), (self.y2-self.y1)/self.length(), (self.z2-self.z1)/self.length()))
         z = np.array((0., 0., 1.))
@@ -1,18 +1,19 @@
 from .abstract import ShapeSet
 from .types import NDArray, List, List2, Tuple, ColorType, Number
-from .pointset2d import PointSet2D
+from .pointset2d import PointSet2D, _write_vertex_list, _color_bytes
 from .line2d import Line2D
 from vvrpywork.scene import Scene2D
 
 import numpy as np
+from pyglet.gl import GL_TRIANGLES
 from pyglet.shapes import Line
-from pyglet.graphics import Group
+from typing import Any
 
 
 class LineSet2D(ShapeSet):
     '''A class used to represent a set of lines in 2D space.'''
 
-    def __init__(self, points:None|NDArray|List|Tuple=None, lines:None|NDArray|List|Tuple=None, width:Number=1, color:ColorType=(0, 0, 0)):
+    def __init__(self, points:None|NDArray|List|Tuple=None, lines:None|NDArray|List|Tuple=None, width:Number=1, color:ColorType=(0, 0, 0), batched:bool=False):
         '''Inits LineSet2D.
 
         Inits a LineSet2D containing `points` connected according to
@@ -29,12 +30,16 @@ class LineSet2D(ShapeSet):
                 line.
             width: The width of the displayed lines.
             color: The color of the displayed lines (RGB or RGBA).
+            batched: Whether to draw all lines from a single vertex
+                list instead of one `Line` per line. Much faster for
+                large linesets.
         '''
         self._points:list[List2] = []
         self._lines:list[List2] = []
 
         self.width = width
         self._colors:list[ColorType] = []
+        self._batched = batched
 
         if isinstance(points, PointSet2D):
             points = points.points
@@ -61,13 +66,33 @@ class LineSet2D(ShapeSet):
 
     def _addToScene(self, scene:Scene2D, name:None|str):
         name = str(id(self)) if name is None else name
+        if self.batched:
+            scene._shapeDict[name] = {"class": self, "shape": self._writeBatch(None, scene)}
+            return
         lines = []
         for i, l in enumerate(self._lines):
-            lines.append(Line(100 * self._points[l[0]][0], 100 * self._points[l[0]][1], 100 * self._points[l[1]][0], 100 * self._points[l[1]][1], self.width, color=tuple(int(255 * _ + 0.5) for _ in self.colors[i]), batch=scene._shapeBatch, group=Group(scene._layer)))
+            lines.append(scene._newLine(100 * self._points[l[0]][0], 100 * self._points[l[0]][1], 100 * self._points[l[1]][0], 100 * self._points[l[1]][1], self.width, tuple(int(255 * _ + 0.5) for _ in self.colors[i])))
         scene._shapeDict[name] = {"class": self, "shape": lines}
 
-    def _update(self, shape:list[Line], scene:Scene2D):
-            if len(shape) == len(self._lines):
+    def _writeBatch(self, vertex_list, scene:Scene2D):
+        points = 100 * np.array(self._points, dtype=float).reshape(-1, 2)
+        lines = np.array(self._lines, dtype=int).reshape(-1, 2)
+        colors = np.array(self._colors, dtype=float).reshape(-1, 4)
+        p1 = points[lines[:, 0]]
+        p2 = points[lines[:, 1]]
+        d = p2 - p1
+        d /= np.maximum(np.linalg.norm(d, axis=1, keepdims=True), 1e-12)
+        n = np.stack((-d[:, 1], d[:, 0]), axis=1) * self.width / 2
+        # every line is a quad of two triangles
+        position = np.stack((p1 + n, p1 - n, p2 - n, p1 + n, p2 - n, p2 + n), axis=1).reshape(-1, 2)
+        colors = np.repeat(colors, 6, axis=0)
+        return _write_vertex_list(vertex_list, scene, scene._batch_shader, GL_TRIANGLES, position=("f", position), colors=("Bn", _color_bytes(colors)))
+
+    def _update(self, shape:list[Line]|Any, scene:Scene2D):
+            if self.batched:
+                self._writeBatch(shape, scene)
+
+            elif len(shape) == len(self._lines):
                 for i, l in enumerate(shape):
                     l.position = (100 * self._points[self._lines[i][0]][0], 100 * self._points[self._lines[i][0]][1])
                     l.x2 = 100 * self._points[self._lines[i][1]][0]
@@ -84,7 +109,7 @@ class LineSet2D(ShapeSet):
                     l.color = tuple(int(255 * _ + 0.5) for _ in self.colors[i])
                 for i, l in enumerate(self._lines[len(shape):]):
                     
-                    shape.append(Line(100 * self._points[l[0]][0], 100 * self._points[l[0]][1], 100 * self._points[l[1]][0], 100 * self._points[l[1]][1], self.width, color=tuple(int(255 * _ + 0.5) for _ in self.colors[len(shape) + i]), batch=scene._shapeBatch, group=Group(scene._layer)))
+                    shape.append(scene._newLine(100 * self._points[l[0]][0], 100 * self._points[l[0]][1], 100 * self._points[l[1]][0], 100 * self._points[l[1]][1], self.width, tuple(int(255 * _ + 0.5) for _ in self.colors[len(shape) + i])))
             
             else:  # len(shape) > len(self._lines)
                 for i, l in enumerate(self._lines):
@@ -93,8 +118,14 @@ class LineSet2D(ShapeSet):
                     shape[i].y2 = 100 * self._points[l[1]][1]
                     shape[i].width = self.width
                     shape[i].color = tuple(int(255 * _ + 0.5) for _ in self.colors[i])
+                scene._releaseShapes(shape[len(self._lines):])
                 del shape[len(self._lines):]
 
+    @property
+    def batched(self) -> bool:
+        '''Whether all lines are drawn from a single vertex list.'''
+        return self._batched
+
     @property
     def points(self) -> NDArray:
         '''The points of the lineset.'''
@@ -0,0 +1,205 @@
+from .abstract import ShapeSet
+from .types import NDArray, List, List3, Tuple, ColorType, Number
+from .point3d import Point3D
+from . import templates
+from vvrpywork.scene import Scene3D
+
+import numpy as np
+import open3d as o3d
+import open3d.visualization.rendering as rendering
+
+
+class MarkerSet3D(ShapeSet):
+    '''A class used to represent a large set of point markers in 3D space.
+
+    Every marker is drawn like a `Point3D`, but all of them are merged
+    into a single geometry built from one cached sphere per resolution,
+    so adding thousands of markers costs one scene geometry instead of
+    thousands. Each marker keeps its own color and size.
+    '''
+
+    def __init__(self, points:None|NDArray|List|Tuple=None, size:Number=1, resolution:int=20, color:ColorType=(0, 0, 0), sprites:bool=False):
+        '''Inits MarkerSet3D.
+
+        Inits a MarkerSet3D containing `points`. If `points` is `None`,
+        the markerset will be initialized empty.
+
+        Args:
+            points: The centers of the markers.
+            size: The size of the displayed markers.
+            resolution: The resolution of the displayed markers.
+            color: The color of the displayed markers (RGB or RGBA).
+            sprites: Whether to draw the markers as a point cloud
+                instead of spheres. Much cheaper, but all markers share
+                the same on-screen size.
+        '''
+        self._points:list[List3] = []
+        self._sizes:list[Number] = []
+        self._colors:list[ColorType] = []
+        self._resolution = resolution
+        self._sprites = sprites
+        self._opacity = color[3] if len(color) == 4 else 1
+        self.size = size
+
+        if points is not None:
+            if isinstance(points, (np.ndarray, list, tuple)):
+                self._points = [list(_) for _ in points]
+                self._sizes = [self.size for _ in points]
+                self._colors = [[*color, 1] if len(color) == 3 else [*color] for _ in points]
+            else:
+                raise TypeError(f"Unsupported type for points: {type(points)}")
+
+    def __len__(self):
+        return len(self._points)
+
+    def __getitem__(self, idx):
+        return self.getPointAt(idx)
+
+    def _build(self):
+        if self.sprites:
+            shape = o3d.geometry.PointCloud()
+            if len(self) > 0:
+                shape.points = o3d.utility.Vector3dVector(self.points)
+                shape.colors = o3d.utility.Vector3dVector(self.colors[:,:3])
+            return shape
+
+        shape = o3d.geometry.TriangleMesh()
+        if len(self) == 0:
+            return shape
+
+        # same sphere as the one Point3D draws, shared by every marker
+        template = templates.sphere(self.resolution, 0.02)
+        t_vertices = np.asarray(template.vertices)
+        t_triangles = np.asarray(template.triangles)
+        t_normals = np.asarray(template.vertex_normals)
+        n, t = len(self), len(t_vertices)
+        vertices = self.points[:, None, :] + self.sizes[:, None, None] * t_vertices[None, :, :]
+        triangles = t_triangles[None, :, :] + (t * np.arange(n))[:, None, None]
+        shape.vertices = o3d.utility.Vector3dVector(vertices.reshape(-1, 3))
+        shape.triangles = o3d.utility.Vector3iVector(triangles.reshape(-1, 3))
+        shape.vertex_normals = o3d.utility.Vector3dVector(np.tile(t_normals, (n, 1)))
+        shape.vertex_colors = o3d.utility.Vector3dVector(np.repeat(self.colors[:,:3], t, axis=0))
+        return shape
+
+    def _addToScene(self, scene:Scene3D, name:None|str):
+        name = str(id(self)) if name is None else name
+        scene._shapeDict[name] = self
+        shape = self._build()
+        material = rendering.MaterialRecord()
+        if self.sprites:
+            material.shader = "defaultUnlit"
+            material.point_size = 5 * self.size
+        else:
+            material.shader = "defaultLitTransparency"
+        material.base_color = (1, 1, 1, self._opacity)
+        scene._scene_widget.scene.add_geometry(name, shape, material)
+
+        self._shape = shape
+        self._material = material
+
+    def _update(self, name:str, scene:Scene3D):
+        scene.removeShape(name)
+        self._addToScene(scene, name)
+
+    @property
+    def points(self) -> NDArray:
+        '''The centers of the markers.'''
+        return np.array(self._points, dtype=float).reshape(-1, 3)
+
+    @points.setter
+    def points(self, points:NDArray|List|Tuple):
+        if isinstance(points, (np.ndarray, list, tuple)):
+            self._points = [list(_) for _ in points]
+
+    @property
+    def sizes(self) -> NDArray:
+        '''The size of each marker.'''
+        return np.array(self._sizes, dtype=float)
+
+    @sizes.setter
+    def sizes(self, sizes:NDArray|List|Tuple):
+        if isinstance(sizes, (np.ndarray, list, tuple)):
+            self._sizes = [float(_) for _ in sizes]
+
+    @property
+    def size(self) -> Number:
+        '''The default size of new markers (and of sprites).'''
+        return self._size
+
+    @size.setter
+    def size(self, size:Number):
+        try:
+            size = size.item()
+        except:
+            pass
+        finally:
+            self._size = size
+
+    @property
+    def colors(self) -> NDArray:
+        '''The markers' colors in RGBA format.'''
+        return np.array(self._colors, dtype=float).reshape(-1, 4)
+
+    @colors.setter
+    def colors(self, colors:NDArray|List|Tuple):
+        if isinstance(colors, (np.ndarray, list, tuple)):
+            self._colors = [list(_) for _ in colors]
+
+    @property
+    def resolution(self) -> int:
+        '''The markers' resolution.
+
+        Every marker is drawn using the same cached sphere. `resolution`
+        represents the amount of triangles that will be used for it.
+        '''
+        return self._resolution
+
+    @property
+    def sprites(self) -> bool:
+        '''Whether the markers are drawn as a point cloud.'''
+        return self._sprites
+
+    def getPointAt(self, index:int) -> Point3D:
+        '''Returns the marker at the specified index.
+
+        Args:
+            index: The index at which the desired marker is placed
+                inside the markerset.
+
+        Returns:
+            The marker at the specified index as a `Point3D` object. It
+                retains its size and color.
+        '''
+        return Point3D(self._points[index], self._sizes[index], self.resolution, color=self._colors[index])
+
+    def add(self, point:Point3D):
+        '''Appends a marker to the markerset.
+
+        Args:
+            point: The `Point3D` object to append. Its size and color
+                are kept.
+        '''
+        self._points.append([point.x, point.y, point.z])
+        self._sizes.append(point.size)
+        self._colors.append([*point.color])
+
+    def remove(self, index:int):
+        '''Removes a marker from the markerset.
+
+        Args:
+            index: The index at which the to-be-removed marker is
+                placed inside the markerset.
+        '''
+        self._points.pop(index)
+        self._sizes.pop(index)
+        self._colors.pop(index)
+
+    def clear(self):
+        '''Clears the markerset.
+
+        Clears the markerset, completely removing all markers and
+        information about them (e.g., color).
+        '''
+        self._points.clear()
+        self._sizes.clear()
+        self._colors.clear()
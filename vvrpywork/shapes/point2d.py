@@ -4,7 +4,6 @@ from vvrpywork.scene import Scene2D
 
 from numpy import ndarray
 from pyglet.shapes import Circle
-from pyglet.graphics import Group
 
 
 class Point2D(Shape):
@@ -40,7 +39,7 @@ class Point2D(Shape):
 
     def _addToScene(self, scene:Scene2D, name:None|str):
         name = str(id(self)) if name is None else name
-        shape = Circle(100 * self.x, 100 * self.y, self.size, self.resolution, tuple(int(255 * _ + 0.5) for _ in self.color), batch=scene._shapeBatch, group=Group(scene._layer))
+        shape = scene._newCircle(100 * self.x, 100 * self.y, self.size, self.resolution, tuple(int(255 * _ + 0.5) for _ in self.color))
         self._resolution = shape._segments
         scene._shapeDict[name] = {"class": self, "shape": shape}
 
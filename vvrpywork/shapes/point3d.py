@@ -1,9 +1,9 @@
 from .abstract import Shape
 from .types import NDArray3, List3, Tuple3, ColorType, Number
+from . import templates
 from vvrpywork.scene import Scene3D
 
 import numpy as np
-import open3d as o3d
 import open3d.visualization.rendering as rendering
 
 
@@ -42,8 +42,7 @@ class Point3D(Shape):
     def _addToScene(self, scene:Scene3D, name:None|str):
         name = str(id(self)) if name is None else name
         scene._shapeDict[name] = self
-        shape = o3d.geometry.TriangleMesh.create_sphere(0.02, self.resolution)
-        shape.compute_vertex_normals()
+        shape = templates.sphere(self.resolution, 0.02)
         material = rendering.MaterialRecord()
         material.shader = "defaultLitTransparency"
         color = self.color
@@ -7,15 +7,60 @@ from vvrpywork.scene import Scene2D
 
 from math import sin, cos
 import numpy as np
+from pyglet.gl import GL_POINTS, GL_BLEND, GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA, GL_PROGRAM_POINT_SIZE, glEnable, glDisable, glBlendFunc
 from pyglet.shapes import Circle
 from pyglet.graphics import Group
 import random
+from typing import Any
+
+
+class _BatchGroup(Group):
+    # draws a batched vertex list with one of the scene's batch shaders and alpha blending, like pyglet's own shapes
+    def __init__(self, program, order:int):
+        super().__init__(order)
+        self.program = program
+
+    def set_state(self):
+        self.program.use()
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+
+    def unset_state(self):
+        glDisable(GL_BLEND)
+        self.program.stop()
+
+class _PointGroup(_BatchGroup):
+    # lets the point shader set gl_PointSize
+    def set_state(self):
+        super().set_state()
+        glEnable(GL_PROGRAM_POINT_SIZE)
+
+    def unset_state(self):
+        glDisable(GL_PROGRAM_POINT_SIZE)
+        super().unset_state()
+
+def _write_vertex_list(vertex_list, scene:Scene2D, program, mode:int, **attributes:tuple[str, NDArray]):
+    # creates the vertex list on first use; afterwards it is resized if needed. Every attribute is
+    # given as (format, array) and the arrays are copied straight into the mapped buffers
+    count = len(attributes["position"][1])
+    if vertex_list is None:
+        group = (_PointGroup if mode == GL_POINTS else _BatchGroup)(program, scene._layer)
+        vertex_list = program.vertex_list(count, mode, batch=scene._shapeBatch, group=group, **{name: fmt for name, (fmt, _) in attributes.items()})
+    elif vertex_list.count != count:
+        vertex_list.resize(count)
+    if count > 0:
+        for name, (_, data) in attributes.items():
+            np.ctypeslib.as_array(getattr(vertex_list, name))[:] = data.ravel()
+    return vertex_list
+
+def _color_bytes(colors:NDArray) -> NDArray:
+    return (255 * colors + 0.5).astype(np.uint8)
 
 
 class PointSet2D(ShapeSet):
     '''A class used to represent a set of points in 2D space.'''
 
-    def __init__(self, points:None|NDArray|List|Tuple=None, size:Number=1, color:ColorType=(0, 0, 0)):
+    def __init__(self, points:None|NDArray|List|Tuple=None, size:Number=1, color:ColorType=(0, 0, 0), batched:bool=False):
         '''Inits PointSet2D.
 
         Inits a PointSet2D containing `points`. If `points` is `None`,
@@ -25,10 +70,14 @@ class PointSet2D(ShapeSet):
             points: The points of the pointset.
             size: The size of the displayed points.
             color: The color of the displayed points (RGB or RGBA).
+            batched: Whether to draw all points from a single vertex
+                list instead of one `Circle` per point. Much faster for
+                large pointsets.
         '''
         self._points:list[List2] = []
         self.size = size
         self._colors:list[ColorType] = []
+        self._batched = batched
 
         if points is not None:
             if isinstance(points, (np.ndarray, list, tuple)):
@@ -45,13 +94,26 @@ class PointSet2D(ShapeSet):
 
     def _addToScene(self, scene:Scene2D, name:None|str):
         name = str(id(self)) if name is None else name
+        if self.batched:
+            scene._shapeDict[name] = {"class": self, "shape": self._writeBatch(None, scene)}
+            return
         points = []
         for p, c in zip(self._points, self._colors):
-            points.append(Circle(100 * p[0], 100 * p[1], self.size, color=tuple(int(255 * _ + 0.5) for _ in c), batch=scene._shapeBatch, group=Group(scene._layer)))
+            points.append(scene._newCircle(100 * p[0], 100 * p[1], self.size, None, tuple(int(255 * _ + 0.5) for _ in c)))
         scene._shapeDict[name] = {"class": self, "shape": points}
 
-    def _update(self, shape:list[Circle], scene:Scene2D):
-            if len(shape) == len(self._points):
+    def _writeBatch(self, vertex_list, scene:Scene2D):
+        # one vertex per point, drawn as a round point of radius size
+        points = np.array(self._points, dtype=np.float32).reshape(-1, 2)
+        colors = np.array(self._colors, dtype=np.float32).reshape(-1, 4)
+        sizes = np.full(len(points), self.size, dtype=np.float32)
+        return _write_vertex_list(vertex_list, scene, scene._point_shader, GL_POINTS, position=("f", 100 * points), colors=("Bn", _color_bytes(colors)), size=("f", sizes))
+
+    def _update(self, shape:list[Circle]|Any, scene:Scene2D):
+            if self.batched:
+                self._writeBatch(shape, scene)
+
+            elif len(shape) == len(self._points):
                 for i, p in enumerate(shape):
                     p.position = (100 * self._points[i][0], 100 * self._points[i][1])
                     p.radius = self.size
@@ -63,15 +125,21 @@ class PointSet2D(ShapeSet):
                     p.radius = self.size
                     p.color = tuple(int(255 * _ + 0.5) for _ in self._colors[i])
                 for p, c in zip(self._points[len(shape):], self._colors[len(shape):]):
-                    shape.append(Circle(100 * p[0], 100 * p[1], self.size, color=tuple(int(255 * _ + 0.5) for _ in c), batch=scene._shapeBatch, group=Group(scene._layer)))
+                    shape.append(scene._newCircle(100 * p[0], 100 * p[1], self.size, None, tuple(int(255 * _ + 0.5) for _ in c)))
             
             else:  # len(shape) > len(self._points)
                 for i, p in enumerate(self._points):
                     shape[i].position = (100 * p[0], 100 * p[1])
                     shape[i].radius = self.size
                     shape[i].color = tuple(int(255 * _ + 0.5) for _ in self._colors[i])
+                scene._releaseShapes(shape[len(self._points):])
                 del shape[len(self._points):]
 
+    @property
+    def batched(self) -> bool:
+        '''Whether all points are drawn from a single vertex list.'''
+        return self._batched
+
     @property
     def points(self) -> NDArray:
         '''The points of the pointset.'''
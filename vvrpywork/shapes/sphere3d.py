@@ -1,6 +1,7 @@
 from .abstract import Shape
 from .types import NDArray3, List3, Tuple3, ColorType, Number
 from .point3d import Point3D
+from . import templates
 from vvrpywork.scene import Scene3D
 
 from numpy import ndarray
@@ -48,8 +49,7 @@ class Sphere3D(Shape):
     def _addToScene(self, scene:Scene3D, name:None|str):
         name = str(id(self)) if name is None else name
         scene._shapeDict[name] = self
-        shape = o3d.geometry.TriangleMesh.create_sphere(1, self.resolution)
-        shape.compute_vertex_normals()
+        shape = templates.sphere(self.resolution)
         material = rendering.MaterialRecord()
         material.shader = "defaultLitTransparency"
         if not self.filled:
@@ -0,0 +1,107 @@
+'''Cache of unit primitive meshes shared by the 3D shapes.
+
+Tessellating a primitive and computing its normals is the expensive part
+of adding a `Sphere3D`, `Line3D`, `Arrow3D` or `Cuboid3D` to a scene.
+The unit versions are built once per resolution and kept in an LRU
+cache; shapes receive a scaled copy and never touch the cached mesh.
+'''
+
+from functools import lru_cache
+from numbers import Number
+import numpy as np
+import open3d as o3d
+
+
+@lru_cache(maxsize=64)
+def _template(kind:str, resolution:int, ratio:float) -> o3d.geometry.TriangleMesh:
+    if kind == "sphere":
+        mesh = o3d.geometry.TriangleMesh.create_sphere(1, resolution)
+    elif kind == "cylinder":
+        mesh = o3d.geometry.TriangleMesh.create_cylinder(1, 1, resolution)
+    elif kind == "arrow":
+        mesh = o3d.geometry.TriangleMesh.create_arrow(1, 2, 1 - ratio, ratio, resolution)
+        mesh.translate((0, 0, -0.5))
+    elif kind == "box":
+        mesh = o3d.geometry.TriangleMesh.create_box(1, 1, 1)
+        mesh.translate((-0.5, -0.5, -0.5))
+    else:
+        raise ValueError(f"Unknown primitive: {kind}")
+    mesh.compute_vertex_normals()
+    return mesh
+
+def _scaled_copy(template:o3d.geometry.TriangleMesh, scale:tuple[Number, Number, Number]) -> o3d.geometry.TriangleMesh:
+    mesh = o3d.geometry.TriangleMesh(template)
+    scale = np.array(scale, dtype=float)
+    if np.all(scale == 1):
+        return mesh
+    vertices = np.asarray(mesh.vertices)
+    vertices *= scale
+    # normals transform with the inverse transpose; only direction matters
+    normals = np.asarray(mesh.vertex_normals)
+    normals /= scale
+    normals /= np.linalg.norm(normals, axis=1, keepdims=True) + 1e-12
+    return mesh
+
+def sphere(resolution:int=20, radius:Number=1) -> o3d.geometry.TriangleMesh:
+    '''Returns a sphere centered at the origin.
+
+    Args:
+        resolution: The resolution of the sphere.
+        radius: The sphere's radius.
+
+    Returns:
+        A new mesh, equivalent to `TriangleMesh.create_sphere` with
+            computed vertex normals (a uniform scale keeps the
+            template normals exact).
+    '''
+    return _scaled_copy(_template("sphere", resolution, 0.), (radius, radius, radius))
+
+def cylinder(resolution:int=20, radius:Number=1, height:Number=1) -> o3d.geometry.TriangleMesh:
+    '''Returns a cylinder along the z-axis, centered at the origin.
+
+    Args:
+        resolution: The resolution of the cylinder.
+        radius: The cylinder's radius.
+        height: The cylinder's height.
+
+    Returns:
+        A new mesh with the vertices of
+            `TriangleMesh.create_cylinder`. Its vertex normals are the
+            unit cylinder's, transformed by the inverse scale, so at
+            the cap rims they differ from what
+            `compute_vertex_normals` would give when the radius and
+            height differ.
+    '''
+    return _scaled_copy(_template("cylinder", resolution, 0.), (radius, radius, height))
+
+def arrow(resolution:int=20, radius:Number=1, length:Number=1, cone_to_cylinder_ratio:Number=0.1) -> o3d.geometry.TriangleMesh:
+    '''Returns an arrow along the z-axis, centered at the origin.
+
+    The cone's radius is twice the cylinder's radius, as in `Arrow3D`.
+
+    Args:
+        resolution: The resolution of the arrow.
+        radius: The radius of the arrow's cylinder.
+        length: The total length of the arrow.
+        cone_to_cylinder_ratio: the percentage of the arrow's
+            length that is taken up by the arrow head.
+
+    Returns:
+        A new mesh. Its vertex normals are the unit arrow's, transformed
+            by the inverse scale, so at the rims they differ from what
+            `compute_vertex_normals` would give when the radius and
+            length differ.
+    '''
+    return _scaled_copy(_template("arrow", resolution, float(cone_to_cylinder_ratio)), (radius, radius, length))
+
+def box() -> o3d.geometry.TriangleMesh:
+    '''Returns a unit cube centered at the origin.
+
+    Returns:
+        A new mesh with computed vertex normals.
+    '''
+    return _scaled_copy(_template("box", 0, 0.), (1, 1, 1))
+
+def clear_cache():
+    '''Drops all cached primitive meshes.'''
+    _template.cache_clear()
@@ -6,7 +6,6 @@ from vvrpywork.scene import Scene2D
 
 from numpy import ndarray
 from pyglet.shapes import Triangle, Line
-from pyglet.graphics import Group
 
 
 class Triangle2D(Shape):
@@ -68,12 +67,12 @@ class Triangle2D(Shape):
     def _addToScene(self, scene:Scene2D, name:None|str):
         if self.filled:
             name = str(id(self)) if name is None else name
-            shape = Triangle(100 * self.x1, 100 * self.y1, 100 * self.x2, 100 * self.y2, 100 * self.x3, 100 * self.y3, tuple(int(255 * _ + 0.5) for _ in self.color), batch=scene._shapeBatch, group=Group(scene._layer))
+            shape = scene._newTriangle(100 * self.x1, 100 * self.y1, 100 * self.x2, 100 * self.y2, 100 * self.x3, 100 * self.y3, tuple(int(255 * _ + 0.5) for _ in self.color))
             scene._shapeDict[name] = {"class": self, "shape": shape}
         else:
-            line1 = Line(100 * self.x1, 100 * self.y1, 100 * self.x2, 100 * self.y2, self.width, tuple(int(255 * _ + 0.5) for _ in self.color), batch=scene._shapeBatch, group=Group(scene._layer))
-            line2 = Line(100 * self.x2, 100 * self.y2, 100 * self.x3, 100 * self.y3, self.width, tuple(int(255 * _ + 0.5) for _ in self.color), batch=scene._shapeBatch, group=Group(scene._layer))
-            line3 = Line(100 * self.x3, 100 * self.y3, 100 * self.x1, 100 * self.y1, self.width, tuple(int(255 * _ + 0.5) for _ in self.color), batch=scene._shapeBatch, group=Group(scene._layer))
+            line1 = scene._newLine(100 * self.x1, 100 * self.y1, 100 * self.x2, 100 * self.y2, self.width, tuple(int(255 * _ + 0.5) for _ in self.color))
+            line2 = scene._newLine(100 * self.x2, 100 * self.y2, 100 * self.x3, 100 * self.y3, self.width, tuple(int(255 * _ + 0.5) for _ in self.color))
+            line3 = scene._newLine(100 * self.x3, 100 * self.y3, 100 * self.x1, 100 * self.y1, self.width, tuple(int(255 * _ + 0.5) for _ in self.color))
             scene._shapeDict[name] = {"class": self, "shape": (line1, line2, line3)}
 
     def _update(self, shape:Triangle|tuple[Line, Line, Line], scene:Scene2D):
@@ -0,0 +1,295 @@
+from .abstract import ShapeSet
+from .types import NDArray, List, Tuple, ColorType, Number
+from .point3d import Point3D
+from .line3d import Line3D
+from . import templates
+from vvrpywork.scene import Scene3D
+
+import numpy as np
+import open3d as o3d
+import open3d.visualization.rendering as rendering
+
+
+def _rotations_from_z(directions:NDArray) -> NDArray:
+    # Rodrigues' formula for the rotations taking (0, 0, 1) onto each unit direction
+    c = directions[:, 2]
+    K = np.zeros((len(directions), 3, 3))
+    K[:, 0, 2] = directions[:, 0]
+    K[:, 1, 2] = directions[:, 1]
+    K[:, 2, 0] = -directions[:, 0]
+    K[:, 2, 1] = -directions[:, 1]
+    flipped = c < -1 + 1e-9
+    scale = np.where(flipped, 0, 1 / np.where(flipped, 1, 1 + c))
+    R = np.eye(3)[None] + K + (K @ K) * scale[:, None, None]
+    R[flipped] = np.diag((1., -1., -1.))
+    return R
+
+
+class TubeSet3D(ShapeSet):
+    '''A class used to represent a set of thick lines in 3D space.
+
+    Every line is drawn like a `Line3D` (as a cylinder), but all of them
+    are merged into a single triangle mesh. The per-line transforms are
+    computed for all lines at once, and after the first draw only the
+    lines that changed are recomputed.
+    '''
+
+    def __init__(self, points:None|NDArray|List|Tuple=None, lines:None|NDArray|List|Tuple=None, width:Number=1, resolution:int=20, color:ColorType=(0, 0, 0)):
+        '''Inits TubeSet3D.
+
+        Inits a TubeSet3D containing `points` connected according to
+        `lines`.
+
+        If `lines` is `None`, the `points` will be connected in pairs
+        i.e., (0, 1), (2, 3), etc.
+
+        If `points` is `None`, the tubeset will be initialized empty.
+
+        Args:
+            points: The points of the tubeset.
+            lines: The indices in `points` that are connected by a
+                line.
+            width: The width of the displayed lines.
+            resolution: The resolution of the displayed lines.
+            color: The color of the displayed lines (RGB or RGBA).
+        '''
+        self._points = np.zeros((0, 3))
+        self._lines = np.zeros((0, 2), dtype=int)
+        self._colors = np.zeros((0, 4))
+        self._resolution = resolution
+        self._opacity = color[3] if len(color) == 4 else 1
+        self.width = width
+
+        if points is not None and lines is None:
+            if isinstance(points, (np.ndarray, list, tuple)) and len(points) % 2 == 0:
+                lines = [[i,i+1] for i in range(0, len(points), 2)]
+            else:
+                raise RuntimeError("Attempted connecting point pairs, but points is not divisible by 2.")
+
+        if points is not None and lines is not None:
+            self._points = np.array(points, dtype=float).reshape(-1, 3)
+            self._lines = np.array(lines, dtype=int).reshape(-1, 2)
+            self._colors = np.tile([*color, 1] if len(color) == 3 else [*color], (len(self._lines), 1)).astype(float)
+
+        self._invalidate()
+
+    def __len__(self):
+        return len(self._lines)
+
+    def __getitem__(self, idx):
+        return self.getLineAt(idx)
+
+    def _invalidate(self):
+        # drop the cached geometry; the next draw rebuilds every line
+        self._vertices = None
+        self._normals = None
+        self._vertex_colors = None
+        self._triangles = None
+        self._dirty = set()
+
+    def _tubes(self, idx:NDArray) -> tuple[NDArray, NDArray]:
+        template = templates.cylinder(self.resolution)
+        t_vertices = np.asarray(template.vertices)
+        t_normals = np.asarray(template.vertex_normals)
+
+        p1 = self._points[self._lines[idx, 0]]
+        p2 = self._points[self._lines[idx, 1]]
+        d = p2 - p1
+        length = np.linalg.norm(d, axis=1)
+        z = np.array((0., 0., 1.))
+        v = np.where(length[:, None] > 0, d / np.maximum(length, 1e-12)[:, None], z)
+        R = _rotations_from_z(v)
+
+        scale = np.empty((len(idx), 3))
+        scale[:, :2] = 0.005 * self.width
+        scale[:, 2] = np.maximum(length, 1e-12)
+
+        vertices = np.einsum("kij,ktj->kti", R, t_vertices[None] * scale[:, None, :]) + ((p1 + p2) / 2)[:, None, :]
+        normals = t_normals[None] / scale[:, None, :]
+        normals /= np.linalg.norm(normals, axis=2, keepdims=True)
+        normals = np.einsum("kij,ktj->kti", R, normals)
+        return vertices, normals
+
+    def _build(self):
+        if self._vertices is None:
+            template = templates.cylinder(self.resolution)
+            t_triangles = np.asarray(template.triangles)
+            idx = np.arange(len(self))
+            self._vertices, self._normals = self._tubes(idx)
+            self._vertex_colors = np.repeat(self._colors[:, None, :3], len(template.vertices), axis=1)
+            self._triangles = t_triangles[None] + (len(template.vertices) * idx)[:, None, None]
+        elif self._dirty:
+            idx = np.fromiter(self._dirty, dtype=int)
+            self._vertices[idx], self._normals[idx] = self._tubes(idx)
+            self._vertex_colors[idx] = self._colors[idx, None, :3]
+        self._dirty.clear()
+
+        shape = o3d.geometry.TriangleMesh()
+        if len(self) > 0:
+            shape.vertices = o3d.utility.Vector3dVector(self._vertices.reshape(-1, 3))
+            shape.triangles = o3d.utility.Vector3iVector(self._triangles.reshape(-1, 3))
+            shape.vertex_normals = o3d.utility.Vector3dVector(self._normals.reshape(-1, 3))
+            shape.vertex_colors = o3d.utility.Vector3dVector(self._vertex_colors.reshape(-1, 3))
+        return shape
+
+    def _addToScene(self, scene:Scene3D, name:None|str):
+        name = str(id(self)) if name is None else name
+        scene._shapeDict[name] = self
+        shape = self._build()
+        material = rendering.MaterialRecord()
+        material.shader = "defaultLitTransparency"
+        material.base_color = (1, 1, 1, self._opacity)
+        scene._scene_widget.scene.add_geometry(name, shape, material)
+
+        self._shape = shape
+        self._material = material
+
+    def _update(self, name:str, scene:Scene3D):
+        # open3d cannot restream part of a triangle mesh; only the changed lines are recomputed
+        scene.removeShape(name)
+        self._addToScene(scene, name)
+
+    @property
+    def points(self) -> NDArray:
+        '''The points of the tubeset.'''
+        return self._points.copy()
+
+    @points.setter
+    def points(self, points:NDArray|List|Tuple):
+        if isinstance(points, (np.ndarray, list, tuple)):
+            points = np.array(points, dtype=float).reshape(-1, 3)
+            if len(points) == len(self._points) and self._vertices is not None:
+                moved = np.nonzero(np.any(points != self._points, axis=1))[0]
+                self._dirty.update(np.nonzero(np.isin(self._lines, moved).any(axis=1))[0].tolist())
+            else:
+                self._invalidate()
+            self._points = points
+
+    @property
+    def lines(self) -> NDArray:
+        '''The point indices indicating lines of the tubeset.'''
+        return self._lines.copy()
+
+    @lines.setter
+    def lines(self, lines:NDArray|List|Tuple):
+        if isinstance(lines, (np.ndarray, list, tuple)):
+            self._lines = np.array(lines, dtype=int).reshape(-1, 2)
+            self._invalidate()
+
+    @property
+    def width(self) -> Number:
+        '''The width of the displayed lines.'''
+        return self._width
+
+    @width.setter
+    def width(self, width:Number):
+        try:
+            width = width.item()
+        except:
+            pass
+        finally:
+            self._width = width
+            self._invalidate()
+
+    @property
+    def resolution(self) -> int:
+        '''The lines' resolution.
+
+        Every line is drawn as a small cylinder using triangles.
+        `resolution` represents the amount of triangles that will be
+        used for each one.
+        '''
+        return self._resolution
+
+    @property
+    def colors(self) -> NDArray:
+        '''The lines' colors in RGBA format.'''
+        return self._colors.copy()
+
+    @colors.setter
+    def colors(self, colors:NDArray|List|Tuple):
+        if isinstance(colors, (np.ndarray, list, tuple)):
+            colors = np.array(colors, dtype=float).reshape(len(self), -1)
+            if colors.shape[1] == 3:
+                colors = np.hstack((colors, np.ones((len(colors), 1))))
+            if self._vertices is not None:
+                self._dirty.update(np.nonzero(np.any(colors != self._colors, axis=1))[0].tolist())
+            self._colors = colors
+
+    def setPoint(self, index:int, point:Point3D|NDArray|List|Tuple):
+        '''Moves a point of the tubeset.
+
+        Only the lines that use this point are recomputed on the next
+        update.
+
+        Args:
+            index: The index of the point to move.
+            point: The new coordinates of the point.
+        '''
+        if isinstance(point, Point3D):
+            point = (point.x, point.y, point.z)
+        self._points[index] = point
+        if self._vertices is not None:
+            self._dirty.update(np.nonzero(np.any(self._lines == index, axis=1))[0].tolist())
+
+    def setColor(self, index:int, color:ColorType):
+        '''Changes the color of a line.
+
+        Args:
+            index: The index of the line to recolor.
+            color: The new color of the line (RGB or RGBA).
+        '''
+        self._colors[index] = [*color, 1] if len(color) == 3 else [*color]
+        if self._vertices is not None:
+            self._dirty.add(index)
+
+    def getLineAt(self, index:int) -> Line3D:
+        '''Returns the line at the specified index.
+
+        Args:
+            index: The index at which the desired line is placed
+                inside the tubeset.
+
+        Returns:
+            The line at the specified index as a `Line3D` object. It
+                retains its width, resolution and color.
+        '''
+        p1, p2 = self._points[self._lines[index]]
+        return Line3D(p1, p2, self.width, self.resolution, color=self._colors[index])
+
+    def add(self, line:Line3D):
+        '''Appends a line to the tubeset.
+
+        Args:
+            line: The `Line3D` object to append.
+        '''
+        n = len(self._points)
+        self._points = np.vstack((self._points, ((line.x1, line.y1, line.z1), (line.x2, line.y2, line.z2))))
+        self._lines = np.vstack((self._lines, ((n, n + 1),)))
+        self._colors = np.vstack((self._colors, (line.color,)))
+        self._invalidate()
+
+    def remove(self, index:int):
+        '''Removes a line from the tubeset.
+
+        Removes a line from the tubeset's specified index (does not
+        affect TubeSet3D.points in any way).
+
+        Args:
+            index: The index at which the to-be-removed line is placed
+                inside the tubeset.
+        '''
+        self._lines = np.delete(self._lines, index, axis=0)
+        self._colors = np.delete(self._colors, index, axis=0)
+        self._invalidate()
+
+    def clear(self):
+        '''Clears the tubeset.
+
+        Clears the tubeset, completely removing all points, lines and
+        information about them (e.g., color).
+        '''
+        self._points = np.zeros((0, 3))
+        self._lines = np.zeros((0, 2), dtype=int)
+        self._colors = np.zeros((0, 4))
+        self._invalidate()